@@ -4,9 +4,13 @@ Example adapter for domain-onchain-payments profile.
 Exports data from internal systems to records format.
 """
 
-import json
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, cast
+
+from builder import jsonio
+
+REQUIRED_COLUMNS = ("domain", "chain", "txid", "timestamp", "currency", "amount")
+OPTIONAL_COLUMNS = ("from", "to", "token_contract", "decimals", "purpose", "order_id", "memo")
 
 
 def export_from_csv(csv_file: str, output_file: str) -> None:
@@ -19,51 +23,53 @@ def export_from_csv(csv_file: str, output_file: str) -> None:
     Args:
         csv_file: Input CSV file path
         output_file: Output JSONL file path
+
+    Raises:
+        KeyError: If a required column is missing from the header; the
+            output file is left untouched
     """
     import csv
 
-    records = []
+    count = 0
     with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Skip empty rows
-            if not row or not any(row.values()):
-                continue
-
-            # Convert to record format
-            record = {
-                "domain": row["domain"],
-                "chain": row["chain"],
-                "txid": row["txid"],
-                "timestamp": row["timestamp"],
-                "currency": row["currency"],
-                "amount": row["amount"]
-            }
-
-            # Optional fields
-            if "from" in row and row["from"]:
-                record["from"] = row["from"]
-            if "to" in row and row["to"]:
-                record["to"] = row["to"]
-            if "token_contract" in row and row["token_contract"]:
-                record["token_contract"] = row["token_contract"]
-            if "decimals" in row and row["decimals"]:
-                record["decimals"] = row["decimals"]
-            if "purpose" in row and row["purpose"]:
-                record["purpose"] = row["purpose"]
-            if "order_id" in row and row["order_id"]:
-                record["order_id"] = row["order_id"]
-            if "memo" in row and row["memo"]:
-                record["memo"] = row["memo"]
-
-            records.append(record)
+        reader = csv.reader(f)
+        header = next(reader, None)
 
-    # Write to JSONL
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for record in records:
-            f.write(json.dumps(record) + '\n')
+        # Empty CSV (e.g. a day without transactions): no header and no
+        # rows, so the output is an empty file
+        if header is None:
+            header = list(REQUIRED_COLUMNS)
+
+        # Resolve column positions once, before the output is truncated
+        columns = {name: i for i, name in enumerate(header)}
+        required = [(name, columns[name]) for name in REQUIRED_COLUMNS]
+        optional = [(name, columns[name]) for name in OPTIONAL_COLUMNS if name in columns]
+        width = len(header)
+
+        with open(output_file, 'wb', buffering=1 << 20) as out:
+            for row in reader:
+                # Skip empty rows
+                if not any(row):
+                    continue
+
+                # Short rows: missing trailing columns are None (null), as with DictReader
+                if len(row) < width:
+                    cast(List[Optional[str]], row).extend([None] * (width - len(row)))
+
+                # Convert to record format
+                record = {name: row[i] for name, i in required}
+
+                # Optional fields
+                for name, i in optional:
+                    if row[i]:
+                        record[name] = row[i]
+
+                # Stream to JSONL as we go (CSV values are strings or None)
+                out.write(jsonio.dumps_line(record, plain=True))
+                out.write(b'\n')
+                count += 1
 
-    print(f"✅ Exported {len(records)} records to {output_file}")
+    print(f"✅ Exported {count} records to {output_file}")
 
 
 def generate_sample_records(output_file: str, count: int = 100) -> None:
@@ -80,26 +86,37 @@ def generate_sample_records(output_file: str, count: int = 100) -> None:
     domains = ["example.com", "test.org", "demo.net", "sample.io"]
     purposes = ["payment", "refund", "deposit", "withdrawal"]
 
-    records = []
-    for i in range(count):
-        record = {
-            "domain": random.choice(domains),
-            "chain": random.choice(chains),
-            "txid": f"0x{''.join(random.choice('0123456789abcdef') for _ in range(64))}",
-            "timestamp": datetime.now().isoformat() + "Z",
+    # Per-batch constants and categorical columns
+    now = datetime.now()
+    timestamp = now.isoformat() + "Z"
+    order_prefix = f"ORDER-{now.strftime('%Y%m%d')}-"
+    getrandbits = random.getrandbits
+    uniform = random.uniform
+
+    records = [
+        {
+            "domain": domain,
+            "chain": chain,
+            "txid": f"0x{getrandbits(256):064x}",
+            "timestamp": timestamp,
             "currency": "USD",
-            "amount": f"{random.uniform(1, 1000):.2f}",
-            "from": f"0x{''.join(random.choice('0123456789abcdef') for _ in range(40))}",
-            "to": f"0x{''.join(random.choice('0123456789abcdef') for _ in range(40))}",
-            "purpose": random.choice(purposes),
-            "order_id": f"ORDER-{datetime.now().strftime('%Y%m%d')}-{i:04d}"
+            "amount": f"{uniform(1, 1000):.2f}",
+            "from": f"0x{getrandbits(160):040x}",
+            "to": f"0x{getrandbits(160):040x}",
+            "purpose": purpose,
+            "order_id": f"{order_prefix}{i:04d}"
         }
-        records.append(record)
+        for i, domain, chain, purpose in zip(
+            range(count),
+            random.choices(domains, k=count),
+            random.choices(chains, k=count),
+            random.choices(purposes, k=count)
+        )
+    ]
 
     # Write to JSONL
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for record in records:
-            f.write(json.dumps(record) + '\n')
+    with open(output_file, 'wb') as f:
+        f.write(jsonio.dumps_lines(records, plain=True))
 
     print(f"✅ Generated {count} sample records to {output_file}")
 
@@ -5,17 +5,32 @@ Core functionality for building proof bundles.
 """
 
 from .build import build_bundle
-from .merkle import build_merkle_tree, compute_leaf, MerkleTree, verify_proof
+from .merkle import (
+    build_merkle_root,
+    build_merkle_tree,
+    compute_leaf,
+    compute_leaf_digest,
+    compute_leaf_many,
+    MerkleStreamBuilder,
+    MerkleTree,
+    verify_compact_proof,
+    verify_proof,
+)
 from .manifest import generate_manifest
 from .append_only_guard import check_append_only
 from .generate_proofs import generate_proofs_for_bundle
 
 __all__ = [
     'build_bundle',
+    'build_merkle_root',
     'build_merkle_tree',
     'compute_leaf',
+    'compute_leaf_digest',
+    'compute_leaf_many',
+    'MerkleStreamBuilder',
     'MerkleTree',
     'verify_proof',
+    'verify_compact_proof',
     'generate_manifest',
     'check_append_only',
     'generate_proofs_for_bundle',
@@ -52,8 +52,7 @@ def check_append_only(
     if not manifest_file.exists():
         return True  # New bundle, OK
 
-    # Load local manifest
-    local_manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+    # Hash local manifest
     local_manifest_sha256 = hashlib.sha256(manifest_file.read_bytes()).hexdigest()
 
     # If remote URL provided, check remote
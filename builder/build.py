@@ -7,13 +7,26 @@ Orchestrates the entire bundle building process.
 import argparse
 import hashlib
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+from . import jsonio
 from . import merkle
 from . import normalizers
 from . import manifest
+from .generate_proofs import PROOF_SHARD_SIZE, write_proofs
+
+# Below this many records, record preparation stays in-process
+PARALLEL_MIN_RECORDS = 1000
+
+# Pool size for record preparation; None uses one worker per CPU
+PARALLEL_WORKERS: Optional[int] = None
 
 
 def load_profile(profile_dir: Path, profile_id: str) -> Dict[str, Any]:
@@ -22,57 +35,199 @@ def load_profile(profile_dir: Path, profile_id: str) -> Dict[str, Any]:
     return json.loads(profile_file.read_text(encoding="utf-8"))
 
 
-def load_records(input_file: Path) -> List[Dict[str, Any]]:
-    """Load records from JSONL file."""
-    records = []
-    with open(input_file, 'r', encoding='utf-8') as f:
+def load_records(
+    input_file: Path,
+    required_fields: Sequence[str] = ()
+) -> List[Dict[str, Any]]:
+    """
+    Load records from JSONL file.
+
+    Args:
+        input_file: Path to input JSONL file
+        required_fields: Fields that must be present and non-empty
+
+    Returns:
+        List of records
+
+    Raises:
+        ValueError: If a record is missing a required field
+    """
+    loads = jsonio.loads
+    records: List[Dict[str, Any]] = []
+    with open(input_file, 'rb') as f:
         for line in f:
-            line = line.strip()
-            if line:
-                records.append(json.loads(line))
+            if line.isspace():
+                continue
+
+            record = loads(line)
+            for field in required_fields:
+                if field not in record or not record[field]:
+                    raise ValueError(f"Record {len(records)}: missing required field '{field}'")
+
+            records.append(record)
     return records
 
 
-def normalize_record(record: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
-    """Apply normalizers to a record."""
-    normalized = {}
-    for field, normalizer_name in profile["normalizers"].items():
-        if field in record or normalizer_name.endswith("_optional"):
-            value = record.get(field, "")
-            normalized[field] = normalizers.apply(normalizer_name, value)
+@dataclass(frozen=True)
+class CompiledProfile:
+    """
+    Profile settings resolved once per build.
+
+    Attributes:
+        normalizers: (field, normalizer function, is_optional) per normalized field
+        canonical_fields: Fields joined into canonical bytes, in order
+        separator: Canonical record separator
+        line_ending: Canonical line ending
+        sort_keys: Sort key fields ("canonical_bytes" sorts by canonical bytes)
+        hash_name: Leaf/node hash algorithm recorded in core_spec.json
+        normalize: Straight-line normalizer generated for this profile
+        canonicalize: Straight-line canonicalizer generated for this profile
+    """
+    normalizers: Tuple[Tuple[str, Callable[[Any], Any], bool], ...]
+    canonical_fields: Tuple[str, ...]
+    separator: str
+    line_ending: str
+    sort_keys: Tuple[str, ...]
+    hash_name: str
+    normalize: Callable[[Dict[str, Any]], Dict[str, Any]] = field(
+        init=False, repr=False, compare=False
+    )
+    canonicalize: Callable[[Dict[str, Any]], str] = field(
+        init=False, repr=False, compare=False
+    )
 
-    # Handle missing optional fields
-    for field in profile["canonical_fields"]:
-        if field not in normalized:
-            normalized[field] = ""
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "normalize", _compile_normalizer(self.normalizers, self.canonical_fields)
+        )
+        object.__setattr__(
+            self, "canonicalize",
+            _compile_canonicalizer(self.canonical_fields, self.separator, self.line_ending)
+        )
+
+    # Generated functions cannot be pickled; pool workers regenerate them
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["normalize"], state["canonicalize"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.__post_init__()
+
+
+# Generated functions are cached per process, so profiles unpickled by a
+# pool worker reuse them instead of generating them again.
+
+@lru_cache(maxsize=None)
+def _compile_normalizer(
+    specs: Tuple[Tuple[str, Callable[[Any], Any], bool], ...],
+    canonical_fields: Tuple[str, ...]
+) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Generate a normalize function with the per-field dispatch unrolled.
 
-    return normalized
+    Behaves exactly like the loop in the original normalize_record: optional
+    fields that are missing or empty become "", and canonical fields that are
+    still missing afterwards are filled with "".
+    """
+    namespace: Dict[str, Any] = {}
+    lines = ["def normalize(record):", "    n = {}"]
+    seen = set()
+    for i, (field, normalizer, optional) in enumerate(specs):
+        namespace[f"_f{i}"] = normalizer
+        lines.append(f"    if {field!r} in record:")
+        if optional:
+            lines.append(f"        v = record[{field!r}]")
+            lines.append(f"        n[{field!r}] = _f{i}(v) if v else ''")
+            lines.append("    else:")
+            lines.append(f"        n[{field!r}] = ''")
+        else:
+            lines.append(f"        n[{field!r}] = _f{i}(record[{field!r}])")
+        seen.add(field)
 
+    for field in canonical_fields:
+        if field not in seen:
+            lines.append(f"    n[{field!r}] = ''")
+        else:
+            lines.append(f"    if {field!r} not in n:")
+            lines.append(f"        n[{field!r}] = ''")
+        seen.add(field)
+
+    lines.append("    return n")
+    exec("\n".join(lines), namespace)
+    normalize: Callable[[Dict[str, Any]], Dict[str, Any]] = namespace["normalize"]
+    return normalize
+
+
+@lru_cache(maxsize=None)
+def _compile_canonicalizer(
+    fields: Tuple[str, ...],
+    separator: str,
+    line_ending: str
+) -> Callable[[Dict[str, Any]], str]:
+    """Generate a canonicalize function concatenating fields in order."""
+    parts = []
+    for i, field in enumerate(fields):
+        if i:
+            parts.append(repr(separator))
+        parts.append(f"n.get({field!r}, '')")
+    parts.append(repr(line_ending))
+
+    namespace: Dict[str, Any] = {}
+    exec(f"def canonicalize(n):\n    return {' + '.join(parts)}\n", namespace)
+    canonicalize: Callable[[Dict[str, Any]], str] = namespace["canonicalize"]
+    return canonicalize
+
+
+def compile_profile(profile: Dict[str, Any]) -> CompiledProfile:
+    """
+    Resolve normalizers and canonicalization settings from a profile.
 
-def canonicalize_record(record: Dict[str, Any], profile: Dict[str, Any]) -> str:
-    """Convert record to canonical bytes."""
-    # Apply normalizers
-    normalized = normalize_record(record, profile)
+    Args:
+        profile: Profile definition
+
+    Returns:
+        CompiledProfile for use with normalize_record and friends
+
+    Raises:
+        ValueError: If the profile references an unknown normalizer or hash
+    """
+    hash_name = profile.get("hash", merkle.DEFAULT_HASH)
+    merkle.get_hash(hash_name)
+
+    return CompiledProfile(
+        normalizers=tuple(
+            (field, normalizers.get_normalizer(name), name.endswith("_optional"))
+            for field, name in profile["normalizers"].items()
+        ),
+        canonical_fields=tuple(profile["canonical_fields"]),
+        separator=profile.get("canonical_record_separator", "|"),
+        line_ending=profile.get("canonical_line_ending", "\n"),
+        sort_keys=tuple(profile["sort_keys"]),
+        hash_name=hash_name
+    )
 
-    # Build canonical string
-    fields = profile["canonical_fields"]
-    separator = profile.get("canonical_record_separator", "|")
-    line_ending = profile.get("canonical_line_ending", "\n")
 
-    canonical = separator.join(normalized.get(f, "") for f in fields)
-    return canonical + line_ending
+def normalize_record(record: Dict[str, Any], ctx: CompiledProfile) -> Dict[str, Any]:
+    """Apply normalizers to a record."""
+    return ctx.normalize(record)
 
 
-def sort_key(record: Dict[str, Any], profile: Dict[str, Any]) -> tuple:
-    """Generate sort key for a record."""
-    normalized = normalize_record(record, profile)
-    canonical_bytes = canonicalize_record(record, profile)
+def _canonical_from_normalized(normalized: Dict[str, Any], ctx: CompiledProfile) -> str:
+    """Build canonical bytes from an already normalized record."""
+    return ctx.canonicalize(normalized)
 
-    sort_keys = profile["sort_keys"]
 
+def _sort_key_from(
+    normalized: Dict[str, Any],
+    canonical_bytes: str,
+    ctx: CompiledProfile
+) -> tuple:
+    """Build sort key from a normalized record and its canonical bytes."""
     # Special handling for canonical_bytes in sort_keys
     key_parts = []
-    for key in sort_keys:
+    for key in ctx.sort_keys:
         if key == "canonical_bytes":
             key_parts.append(canonical_bytes)
         else:
@@ -81,12 +236,73 @@ def sort_key(record: Dict[str, Any], profile: Dict[str, Any]) -> tuple:
     return tuple(key_parts)
 
 
+def canonicalize_record(record: Dict[str, Any], ctx: CompiledProfile) -> str:
+    """Convert record to canonical bytes."""
+    return _canonical_from_normalized(normalize_record(record, ctx), ctx)
+
+
+def sort_key(record: Dict[str, Any], ctx: CompiledProfile) -> tuple:
+    """Generate sort key for a record."""
+    normalized = normalize_record(record, ctx)
+    canonical_bytes = _canonical_from_normalized(normalized, ctx)
+    return _sort_key_from(normalized, canonical_bytes, ctx)
+
+
+def _prepare_chunk(
+    records: List[Dict[str, Any]],
+    ctx: CompiledProfile
+) -> List[Tuple[tuple, str, bytes]]:
+    """Normalize each record once; return (sort key, canonical bytes, leaf) per record."""
+    keys = []
+    canonicals = []
+    normalize = ctx.normalize
+    canonicalize = ctx.canonicalize
+
+    for record in records:
+        normalized = normalize(record)
+        canonical = canonicalize(normalized)
+        keys.append(_sort_key_from(normalized, canonical, ctx))
+        canonicals.append(canonical)
+
+    # Hash all leaves of the chunk in one batch
+    leaves = merkle.compute_leaf_many([c.encode('utf-8') for c in canonicals], ctx.hash_name)
+
+    return list(zip(keys, canonicals, leaves))
+
+
+def prepare_records(
+    records: List[Dict[str, Any]],
+    ctx: CompiledProfile
+) -> List[Tuple[tuple, str, bytes]]:
+    """
+    Compute sort key, canonical bytes and leaf digest for records, in order.
+
+    Large inputs are split into one chunk per CPU and processed in a process
+    pool; small inputs are processed in-process.
+    """
+    workers = PARALLEL_WORKERS or os.cpu_count() or 1
+    if workers == 1 or len(records) < PARALLEL_MIN_RECORDS:
+        return _prepare_chunk(records, ctx)
+
+    chunk_size = -(-len(records) // workers)
+    chunks = [records[i:i+chunk_size] for i in range(0, len(records), chunk_size)]
+
+    prepared = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_prepared in executor.map(_prepare_chunk, chunks, repeat(ctx)):
+            prepared.extend(chunk_prepared)
+
+    return prepared
+
+
 def build_bundle(
     input_file: Path,
     profile_dir: Path,
     profile_id: str,
     date: str,
-    output_dir: Path
+    output_dir: Path,
+    proof_format: str = "compact",
+    proof_shard_size: int = PROOF_SHARD_SIZE
 ) -> Dict[str, Any]:
     """
     Build a complete proof bundle.
@@ -97,52 +313,50 @@ def build_bundle(
         profile_id: Profile ID to use
         date: Bundle date (YYYY-MM-DD)
         output_dir: Output directory
+        proof_format: "compact" or "legacy" proof file format
+        proof_shard_size: Proofs per shard file; 0 writes one file per proof
 
     Returns:
         Dictionary with build results
+
+    Raises:
+        ValueError: If proof_shard_size is negative
     """
+    if proof_shard_size < 0:
+        raise ValueError(f"Proof shard size must be >= 0, got {proof_shard_size}")
+
     # Load profile
     profile = load_profile(profile_dir, profile_id)
 
-    # Load records
-    records = load_records(input_file)
-
-    # Validate required fields
-    for i, record in enumerate(records):
-        for field in profile["required_fields"]:
-            if field not in record or not record[field]:
-                raise ValueError(f"Record {i}: missing required field '{field}'")
+    # Load and validate records
+    records = load_records(input_file, profile["required_fields"])
 
-    # Sort records
-    sorted_records = sorted(records, key=lambda r: sort_key(r, profile))
-
-    # Compute canonical bytes and leaves
-    leaves = []
-    canonical_bytes_list = []
-
-    for record in sorted_records:
-        canonical = canonicalize_record(record, profile)
-        canonical_bytes_list.append(canonical)
-        leaf = merkle.compute_leaf(canonical)
-        leaves.append(leaf)
-
-    # Build Merkle tree
-    root = merkle.build_merkle_tree(leaves)
+    # Normalize each record once, then sort by the precomputed key
+    ctx = compile_profile(profile)
+    prepared = prepare_records(records, ctx)
+    order = sorted(range(len(records)), key=lambda i: prepared[i][0])
 
     # Generate output files
     bundle_dir = output_dir / f"proofs/{date}"
     bundle_dir.mkdir(parents=True, exist_ok=True)
 
-    # Write records
+    # Write records in sorted order, folding each leaf into the streaming root
+    stream = merkle.MerkleStreamBuilder(ctx.hash_name)
+    leaves = []
     records_per_file = 10000
-    for i in range(0, len(sorted_records), records_per_file):
-        chunk = sorted_records[i:i+records_per_file]
+    for i in range(0, len(order), records_per_file):
+        chunk = order[i:i+records_per_file]
         file_num = i // records_per_file
         records_file = bundle_dir / f"records-{file_num:03d}.jsonl"
 
-        with open(records_file, 'w', encoding='utf-8') as f:
-            for record in chunk:
-                f.write(json.dumps(record) + '\n')
+        records_file.write_bytes(jsonio.dumps_lines(records[j] for j in chunk))
+
+        for j in chunk:
+            leaf = prepared[j][2]
+            stream.push(leaf)
+            leaves.append(leaf)
+
+    root = stream.root().hex()
 
     # Write daily_root.txt
     root_file = bundle_dir / "daily_root.txt"
@@ -151,7 +365,7 @@ def build_bundle(
     # Write core_spec.json
     core_spec = {
         "core_spec_version": "1.2.1",
-        "hash": "sha256",
+        "hash": ctx.hash_name,
         "merkle": "binary",
         "odd_leaf": "duplicate_last",
         "hex": "lowercase",
@@ -160,7 +374,7 @@ def build_bundle(
         "canonical_record_separator": "|"
     }
     core_spec_file = bundle_dir / "core_spec.json"
-    core_spec_file.write_text(json.dumps(core_spec, indent=2) + '\n', encoding='utf-8')
+    core_spec_file.write_bytes(jsonio.dumps_pretty(core_spec))
 
     # Write profile.json
     profile_json = {
@@ -169,7 +383,7 @@ def build_bundle(
         "profile_sha256": "..."  # TODO: compute from profile files
     }
     profile_file = bundle_dir / "profile.json"
-    profile_file.write_text(json.dumps(profile_json, indent=2) + '\n', encoding='utf-8')
+    profile_file.write_bytes(jsonio.dumps_pretty(profile_json))
 
     # Generate manifest
     files_list = list(bundle_dir.glob("records-*.jsonl"))
@@ -184,70 +398,37 @@ def build_bundle(
     )
 
     manifest_file = bundle_dir / "manifest.json"
-    manifest_file.write_text(json.dumps(manifest_data, indent=2) + '\n', encoding='utf-8')
+    manifest_bytes = jsonio.dumps_pretty(manifest_data)
+    manifest_file.write_bytes(manifest_bytes)
 
     # Write checkpoint.json
     checkpoint = {
         "version": "1",
         "date": date,
-        "manifest_sha256": hashlib.sha256(manifest_file.read_bytes()).hexdigest(),
+        "manifest_sha256": hashlib.sha256(manifest_bytes).hexdigest(),
         "daily_root": root,
         "prev_checkpoint_sha256": "0000000000000000000000000000000000000000000000000000000000000"
     }
     checkpoint_file = bundle_dir / "checkpoint.json"
-    checkpoint_file.write_text(json.dumps(checkpoint, indent=2) + '\n', encoding='utf-8')
+    checkpoint_file.write_bytes(jsonio.dumps_pretty(checkpoint))
 
     # Generate Merkle proofs for all records
     print(f"📝 Generating Merkle proofs...")
     from .merkle import MerkleTree
 
     # Build Merkle tree with proof support
-    tree = MerkleTree(leaves)
+    tree = MerkleTree.from_digests(leaves, ctx.hash_name)
 
     # Verify root matches
     if tree.root != root:
         raise ValueError(f"MerkleTree root mismatch: {tree.root} vs {root}")
 
     # Generate proofs
-    proofs_dir = bundle_dir / "proofs"
-    proofs_dir.mkdir(exist_ok=True)
-
-    proof_metadata = []
-
-    for idx in range(len(leaves)):
-        proof_data = tree.generate_proof(idx)
-
-        # Save individual proof
-        proof_file = proofs_dir / f"{idx}.json"
-        with open(proof_file, 'w') as f:
-            f.write(json.dumps(proof_data, indent=2))
-
-        proof_metadata.append({
-            "record_index": idx,
-            "proof_file": f"proofs/{idx}.json",
-            "leaf_hash": proof_data["leaf_hash"]
-        })
-
-        if (idx + 1) % 100 == 0:
-            print(f"   Generated {idx + 1}/{len(leaves)} proofs...")
-
-    # Save proof index
-    proof_index_file = bundle_dir / "proof_index.json"
-    with open(proof_index_file, 'w') as f:
-        json.dump({
-            "version": "1",
-            "total_records": len(leaves),
-            "merkle_root": tree.root,
-            "proofs": proof_metadata
-        }, f, indent=2)
-
-    print(f"✅ Generated {len(leaves)} proofs")
-    print(f"📁 Proof index: {proof_index_file}")
-    print(f"📁 Proofs directory: {proofs_dir}")
+    write_proofs(tree, bundle_dir, proof_format, proof_shard_size)
 
     return {
         "date": date,
-        "records_count": len(sorted_records),
+        "records_count": len(records),
         "daily_root": root,
         "bundle_dir": bundle_dir
     }
@@ -261,6 +442,18 @@ def main():
     parser.add_argument("--profile", default="domain-onchain-payments", help="Profile ID")
     parser.add_argument("--date", help="Bundle date (YYYY-MM-DD)")
     parser.add_argument("--output", required=True, help="Output directory")
+    parser.add_argument(
+        "--proof-format",
+        choices=["compact", "legacy"],
+        default="compact",
+        help="Proof file format (legacy: list of direction/sibling_hash steps)"
+    )
+    parser.add_argument(
+        "--proof-shard-size",
+        type=int,
+        default=PROOF_SHARD_SIZE,
+        help="Proofs per shard file (0: one file per proof)"
+    )
 
     args = parser.parse_args()
 
@@ -274,7 +467,9 @@ def main():
         profile_dir=Path(args.profile_dir),
         profile_id=args.profile,
         date=args.date,
-        output_dir=Path(args.output)
+        output_dir=Path(args.output),
+        proof_format=args.proof_format,
+        proof_shard_size=args.proof_shard_size
     )
 
     print(f"✅ Bundle built successfully!")
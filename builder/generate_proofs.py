@@ -3,11 +3,23 @@ Generate Merkle proofs for all records in a bundle.
 """
 
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List, Optional
 
-from .merkle import MerkleTree, verify_proof, compute_leaf
+from . import jsonio
+from .merkle import DEFAULT_HASH, MerkleTree, verify_proof, compute_leaf_digest
+
+# Proofs per proofs/shard-XXX.json file
+PROOF_SHARD_SIZE = 1000
+
+# Below this many proofs, proof files are written in-process
+PARALLEL_MIN_PROOFS = 10000
+
+# Pool size for proof writing; None uses one worker per CPU
+PARALLEL_WORKERS: Optional[int] = None
 
 
 def _get_deterministic_json():
@@ -31,13 +43,165 @@ def _get_deterministic_json():
     raise ImportError("Cannot find ledger-spec module")
 
 
-def generate_proofs_for_bundle(bundle_dir: str) -> None:
+def _proof_maker(tree: MerkleTree, proof_format: str) -> Callable[[int], Dict]:
+    """Return the proof generator for a proof format."""
+    if proof_format == "compact":
+        return tree.generate_compact_proof
+    if proof_format == "legacy":
+        return tree.generate_proof
+    raise ValueError(f"Unknown proof format: {proof_format}")
+
+
+def _write_proof_range(
+    tree: MerkleTree,
+    proofs_dir: Path,
+    proof_format: str,
+    start: int,
+    stop: int,
+    shard: Optional[int]
+) -> int:
+    """
+    Write proofs for leaves [start, stop).
+
+    With a shard number, all proofs go into proofs/shard-XXX.json keyed by
+    record index; otherwise each proof is written to proofs/{idx}.json.
+
+    Returns:
+        Number of proofs written
+    """
+    make_proof = _proof_maker(tree, proof_format)
+
+    if shard is None:
+        for idx in range(start, stop):
+            proof_file = proofs_dir / f"{idx}.json"
+            proof_file.write_bytes(jsonio.dumps_pretty(make_proof(idx), plain=True))
+    else:
+        shard_proofs = {str(idx): make_proof(idx) for idx in range(start, stop)}
+        shard_file = proofs_dir / f"shard-{shard:03d}.json"
+        shard_file.write_bytes(jsonio.dumps_line(shard_proofs, plain=True) + b'\n')
+
+    return stop - start
+
+
+# Tree shared with pool workers, set once per worker process
+_worker_tree: Optional[MerkleTree] = None
+
+
+def _init_worker(tree: MerkleTree) -> None:
+    """Pool initializer: receive the tree once instead of once per task."""
+    global _worker_tree
+    _worker_tree = tree
+
+
+def _write_proof_range_in_worker(*args: Any) -> int:
+    """Pool task: _write_proof_range against the worker's shared tree."""
+    assert _worker_tree is not None, "worker started without _init_worker"
+    return _write_proof_range(_worker_tree, *args)
+
+
+def write_proofs(
+    tree: MerkleTree,
+    bundle_path: Path,
+    proof_format: str = "compact",
+    shard_size: int = PROOF_SHARD_SIZE
+) -> Path:
+    """
+    Write proof files for every leaf plus proof_index.json.
+
+    Args:
+        tree: Merkle tree of the bundle
+        bundle_path: Bundle directory
+        proof_format: "compact" (dirs bitmap + siblings) or "legacy"
+            (list of direction/sibling_hash steps)
+        shard_size: Proofs per proofs/shard-XXX.json file; 0 writes one
+            proofs/{idx}.json file per record
+
+    Returns:
+        Path to proof_index.json
+
+    Raises:
+        ValueError: If proof_format is unknown or shard_size is negative
+    """
+    # Fail fast on unknown formats
+    _proof_maker(tree, proof_format)
+    if shard_size < 0:
+        raise ValueError(f"Proof shard size must be >= 0, got {shard_size}")
+
+    proofs_dir = bundle_path / "proofs"
+    proofs_dir.mkdir(exist_ok=True)
+
+    total = tree.leaf_count
+    step = shard_size or PROOF_SHARD_SIZE
+    tasks = [
+        (proofs_dir, proof_format, start, min(start + step, total),
+         start // step if shard_size else None)
+        for start in range(0, total, step)
+    ]
+
+    workers = PARALLEL_WORKERS or os.cpu_count() or 1
+    done = 0
+    if workers == 1 or total < PARALLEL_MIN_PROOFS:
+        for task in tasks:
+            done += _write_proof_range(tree, *task)
+            print(f"   Generated {done}/{total} proofs...")
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(tree,)
+        ) as executor:
+            for written in executor.map(_write_proof_range_in_worker, *zip(*tasks)):
+                done += written
+                print(f"   Generated {done}/{total} proofs...")
+
+    # Save proof index
+    if shard_size:
+        proof_metadata = [
+            {"record_index": idx, "shard": idx // shard_size, "leaf_hash": leaf_hash}
+            for idx, leaf_hash in enumerate(tree.leaves)
+        ]
+    else:
+        proof_metadata = [
+            {"record_index": idx, "proof_file": f"proofs/{idx}.json", "leaf_hash": leaf_hash}
+            for idx, leaf_hash in enumerate(tree.leaves)
+        ]
+
+    proof_index_file = bundle_path / "proof_index.json"
+    proof_index_file.write_bytes(jsonio.dumps_pretty({
+        "version": "1",
+        "total_records": total,
+        "merkle_root": tree.root,
+        "proof_format": proof_format,
+        "proof_shard_size": shard_size,
+        "proofs": proof_metadata
+    }, plain=True))
+
+    print(f"✅ Generated {total} proofs")
+    print(f"📁 Proof index: {proof_index_file}")
+    print(f"📁 Proofs directory: {proofs_dir}")
+
+    return proof_index_file
+
+
+def generate_proofs_for_bundle(
+    bundle_dir: str,
+    proof_format: str = "compact",
+    shard_size: int = PROOF_SHARD_SIZE
+) -> None:
     """
     Generate Merkle proof files for all records in a bundle.
 
     Args:
         bundle_dir: Path to the bundle directory (e.g., dist/proofs/2026-01-17/)
+        proof_format: "compact" or "legacy" proof file format
+        shard_size: Proofs per shard file; 0 writes one file per proof
+
+    Raises:
+        ValueError: If shard_size is negative
     """
+    if shard_size < 0:
+        raise ValueError(f"Proof shard size must be >= 0, got {shard_size}")
+
     bundle_path = Path(bundle_dir)
 
     # Read manifest
@@ -48,6 +212,13 @@ def generate_proofs_for_bundle(bundle_dir: str) -> None:
     with open(manifest_path, 'r') as f:
         manifest = json.load(f)
 
+    # Leaf/node hash recorded at build time
+    core_spec_path = bundle_path / "core_spec.json"
+    hash_name = DEFAULT_HASH
+    if core_spec_path.exists():
+        with open(core_spec_path, 'r') as f:
+            hash_name = json.load(f).get("hash", DEFAULT_HASH)
+
     # Read records files to get all leaves
     records_files = sorted([
         f for f in bundle_path.glob("records-*.jsonl")
@@ -70,14 +241,13 @@ def generate_proofs_for_bundle(bundle_dir: str) -> None:
                     # Compute leaf hash from canonical bytes
                     deterministic_json = _get_deterministic_json()
                     canonical = deterministic_json(record)
-                    leaf_hash = compute_leaf(canonical)
-                    leaves.append(leaf_hash)
+                    leaves.append(compute_leaf_digest(canonical, hash_name))
 
     print(f"📊 Loaded {len(leaves)} records")
 
     # Build Merkle tree
     print("🌳 Building Merkle tree...")
-    tree = MerkleTree(leaves)
+    tree = MerkleTree.from_digests(leaves, hash_name)
 
     # Verify root matches
     daily_root_path = bundle_path / "daily_root.txt"
@@ -92,41 +262,7 @@ def generate_proofs_for_bundle(bundle_dir: str) -> None:
     # Generate proofs for all records
     print(f"📝 Generating proofs for {len(leaves)} records...")
 
-    proofs_dir = bundle_path / "proofs"
-    proofs_dir.mkdir(exist_ok=True)
-
-    proof_metadata = []
-
-    for idx in range(len(leaves)):
-        proof_data = tree.generate_proof(idx)
-
-        # Save individual proof
-        proof_file = proofs_dir / f"{idx}.json"
-        with open(proof_file, 'w') as f:
-            json.dump(proof_data, f, indent=2)
-
-        proof_metadata.append({
-            "record_index": idx,
-            "proof_file": f"proofs/{idx}.json",
-            "leaf_hash": proof_data["leaf_hash"]
-        })
-
-        if (idx + 1) % 100 == 0:
-            print(f"   Generated {idx + 1}/{len(leaves)} proofs...")
-
-    # Save proof index
-    proof_index_file = bundle_path / "proof_index.json"
-    with open(proof_index_file, 'w') as f:
-        json.dump({
-            "version": "1",
-            "total_records": len(leaves),
-            "merkle_root": tree.root,
-            "proofs": proof_metadata
-        }, f, indent=2)
-
-    print(f"✅ Generated {len(leaves)} proofs")
-    print(f"📁 Proof index: {proof_index_file}")
-    print(f"📁 Proofs directory: {proofs_dir}")
+    write_proofs(tree, bundle_path, proof_format, shard_size)
 
     # Verify a few random proofs
     print("\n🔍 Verifying sample proofs...")
@@ -138,7 +274,8 @@ def generate_proofs_for_bundle(bundle_dir: str) -> None:
         is_valid = verify_proof(
             proof_data["leaf_hash"],
             proof_data["proof"],
-            proof_data["expected_root"]
+            proof_data["expected_root"],
+            hash_name
         )
 
         if is_valid:
@@ -155,11 +292,23 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Generate Merkle proofs for a bundle")
     parser.add_argument("--bundle-dir", required=True, help="Bundle directory path")
+    parser.add_argument(
+        "--proof-format",
+        choices=["compact", "legacy"],
+        default="compact",
+        help="Proof file format (legacy: list of direction/sibling_hash steps)"
+    )
+    parser.add_argument(
+        "--proof-shard-size",
+        type=int,
+        default=PROOF_SHARD_SIZE,
+        help="Proofs per shard file (0: one file per proof)"
+    )
 
     args = parser.parse_args()
 
     try:
-        generate_proofs_for_bundle(args.bundle_dir)
+        generate_proofs_for_bundle(args.bundle_dir, args.proof_format, args.proof_shard_size)
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
         sys.exit(1)
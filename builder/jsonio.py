@@ -0,0 +1,97 @@
+"""
+JSON serialization helpers for ledger-publisher.
+
+The standard library is authoritative for published bytes. By default
+output keeps json.dumps' format (", "/": " separators, non-ASCII escaped),
+so arbitrary records, including ones with lone surrogates, serialize as
+they always have. Values the caller marks as plain (see dumps_line) use
+compact raw UTF-8 output, produced by orjson when installed; both backends
+give identical bytes for those, so bundles do not depend on which one was
+available at build time.
+"""
+
+import json
+from typing import Any, Iterable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def dumps_line(obj: Any, plain: bool = False) -> bytes:
+    """
+    Serialize to single-line JSON.
+
+    Args:
+        obj: JSON-serializable object
+        plain: obj contains only dicts with str keys, lists, str (valid
+            Unicode), bool, None and ints within 64 bits (no floats). Output
+            is then compact raw UTF-8, by orjson if available. Floats, NaN,
+            larger ints and lone surrogates are formatted differently or
+            rejected by orjson, so leave this False for arbitrary input.
+
+    Returns:
+        UTF-8 encoded JSON without trailing newline; json.dumps(obj) format
+        unless plain
+    """
+    if plain:
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj).encode('ascii')
+
+
+def dumps_pretty(obj: Any, plain: bool = False) -> bytes:
+    """
+    Serialize to 2-space indented JSON.
+
+    Args:
+        obj: JSON-serializable object
+        plain: See dumps_line
+
+    Returns:
+        UTF-8 encoded JSON with trailing newline
+    """
+    if plain:
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(obj, indent=2, ensure_ascii=False) + '\n').encode('utf-8')
+    return (json.dumps(obj, indent=2) + '\n').encode('ascii')
+
+
+def dumps_lines(records: Iterable[Any], plain: bool = False) -> bytearray:
+    """
+    Serialize records as JSON Lines in a single buffer.
+
+    The buffer is meant to be written with one write call.
+
+    Args:
+        records: JSON-serializable objects
+        plain: See dumps_line
+
+    Returns:
+        UTF-8 encoded JSONL, one record per line, each ending with newline
+    """
+    buf = bytearray()
+    extend = buf.extend
+    for record in records:
+        extend(dumps_line(record, plain))
+        extend(b'\n')
+    return buf
+
+
+def loads(data: bytes) -> Any:
+    """
+    Parse JSON from bytes.
+
+    Always uses the standard library: orjson silently turns integers beyond
+    64 bits (e.g. on-chain amounts in wei) into floats.
+
+    Args:
+        data: UTF-8 encoded JSON document
+
+    Returns:
+        Parsed object
+    """
+    return json.loads(data)
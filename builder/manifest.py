@@ -6,13 +6,29 @@ Generates manifest.json with file hashes and sizes.
 
 import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+# Read size for streaming file hashes
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def _sha_and_size(file_path: Path) -> Tuple[str, str, int]:
+    """Hash a file in chunks; return (name, sha256 hex, size in bytes)."""
+    h = hashlib.sha256()
+    size = 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            h.update(chunk)
+            size += len(chunk)
+    return file_path.name, h.hexdigest(), size
 
 
 def compute_file_hash(file_path: Path) -> str:
     """Compute SHA256 hash of a file."""
-    return hashlib.sha256(file_path.read_bytes()).hexdigest()
+    return _sha_and_size(file_path)[1]
 
 
 def compute_file_size(file_path: Path) -> int:
@@ -38,18 +54,12 @@ def generate_manifest(
     Returns:
         Manifest dictionary
     """
-    files_data = []
-
-    for file_path in sorted(files):
-        relative_path = file_path.name
-        sha256 = compute_file_hash(file_path)
-        size = compute_file_size(file_path)
-
-        files_data.append({
-            "path": relative_path,
-            "sha256": sha256,
-            "size": size
-        })
+    # hashlib releases the GIL while hashing, so files hash concurrently
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        files_data = [
+            {"path": name, "sha256": sha256, "size": size}
+            for name, sha256, size in executor.map(_sha_and_size, sorted(files))
+        ]
 
     # Compute total bytes
     total_bytes = sum(f["size"] for f in files_data)
@@ -6,34 +6,226 @@ Includes Merkle proof generation and verification.
 """
 
 import hashlib
-from typing import List, Dict, Tuple
+import warnings
+from binascii import hexlify
+from typing import Callable, List, Dict, Protocol, Tuple, Union
 
+# hashlib.sha256 is OpenSSL's implementation, which selects SHA-NI/AVX2 code
+# paths at runtime; hashlib itself falls back to its builtin when OpenSSL's
+# sha256 is missing or unusable (e.g. FIPS restrictions).
+_sha256 = hashlib.sha256
+SHA256_OPENSSL = type(_sha256()).__module__ == '_hashlib'
+if not SHA256_OPENSSL:
+    warnings.warn(
+        "hashlib SHA256 is not backed by OpenSSL; using the slower builtin "
+        "implementation (no SHA-NI acceleration)",
+        RuntimeWarning
+    )
 
-def compute_leaf(canonical_bytes: str) -> str:
+try:
+    import blake3  # type: ignore[import-not-found]
+except ImportError:
+    blake3 = None  # type: ignore[assignment]
+
+# Leaf/node hash used unless the profile selects another one
+DEFAULT_HASH = "sha256"
+
+# Size of a raw digest (SHA256 and BLAKE3 both produce 32 bytes); layers
+# are stored as contiguous digests
+NODE_SIZE = 32
+
+
+class HashObject(Protocol):
+    """Hash object returned by the constructors from get_hash."""
+
+    def digest(self) -> bytes: ...
+
+    def hexdigest(self) -> str: ...
+
+
+def get_hash(hash_name: str = DEFAULT_HASH) -> Callable[[bytes], HashObject]:
+    """
+    Look up a hash constructor by its core_spec name.
+
+    Args:
+        hash_name: "sha256" or "blake3"
+
+    Returns:
+        Constructor returning an object with digest()/hexdigest()
+
+    Raises:
+        ValueError: If the algorithm is unknown or its backend is missing
+    """
+    if hash_name == "sha256":
+        return _sha256
+    if hash_name == "blake3":
+        if blake3 is None:
+            raise ValueError("Hash 'blake3' requires the blake3 package")
+        blake3_hash: Callable[[bytes], HashObject] = blake3.blake3
+        return blake3_hash
+    raise ValueError(f"Unknown hash algorithm: {hash_name}")
+
+
+def compute_leaf_digest(
+    canonical_bytes: Union[str, bytes],
+    hash_name: str = DEFAULT_HASH
+) -> bytes:
+    """
+    Compute raw leaf digest from canonical bytes.
+
+    Args:
+        canonical_bytes: Canonical string representation, or its UTF-8
+            encoding
+        hash_name: Hash algorithm ("sha256" or "blake3")
+
+    Returns:
+        Leaf digest (32 bytes)
+    """
+    if isinstance(canonical_bytes, str):
+        canonical_bytes = canonical_bytes.encode('utf-8')
+    return get_hash(hash_name)(canonical_bytes).digest()
+
+
+def compute_leaf_many(canonicals: List[bytes], hash_name: str = DEFAULT_HASH) -> List[bytes]:
+    """
+    Compute raw leaf digests for a batch of UTF-8 encoded canonical records.
+
+    Resolves the hash once and hashes the batch with hash_many, so bulk leaf
+    hashing costs one C-level hash call per record.
+
+    Args:
+        canonicals: Canonical records, already UTF-8 encoded
+        hash_name: Hash algorithm ("sha256" or "blake3")
+
+    Returns:
+        Leaf digests (32 bytes each), in input order
+    """
+    return hash_many(get_hash(hash_name), canonicals)
+
+
+def compute_leaf(canonical_bytes: Union[str, bytes], hash_name: str = DEFAULT_HASH) -> str:
     """
     Compute leaf hash from canonical bytes.
 
     Args:
-        canonical_bytes: Canonical string representation
+        canonical_bytes: Canonical string representation, or its UTF-8
+            encoding
+        hash_name: Hash algorithm ("sha256" or "blake3")
+
+    Returns:
+        Leaf hash as lowercase hex string
+    """
+    return compute_leaf_digest(canonical_bytes, hash_name).hex()
+
+
+def hash_many(new_hash: Callable[[bytes], HashObject], bufs: List[bytes]) -> List[bytes]:
+    """
+    Hash a batch of independent buffers.
+
+    All pair hashes of a tree level go through this single call so that a
+    multi-buffer backend can be dropped in without touching the tree code.
+    The current backends are hashlib (OpenSSL) and blake3.
+
+    Args:
+        new_hash: Hash constructor from get_hash
+        bufs: Buffers to hash
 
     Returns:
-        SHA256 hash as lowercase hex string
+        Digests (32 bytes each), in input order
     """
-    return hashlib.sha256(canonical_bytes.encode('utf-8')).hexdigest()
+    return [new_hash(buf).digest() for buf in bufs]
 
 
-def build_merkle_tree(leaves: List[str]) -> str:
+def _pair_buffers(layer: bytes) -> List[bytes]:
+    """
+    Build the hash input of every parent node of an even-length layer.
+
+    The layer is stored contiguously (32 bytes per node). Each parent input
+    is the hex encoding of its left and right child (128 bytes); the whole
+    layer is hexlified in one call and then sliced.
+    """
+    hexed = hexlify(layer)
+    return [hexed[i:i+128] for i in range(0, len(hexed), 128)]
+
+
+def _check_digests(digests: List[bytes]) -> None:
+    """
+    Ensure every leaf digest is NODE_SIZE bytes.
+
+    Layers are stored as contiguous NODE_SIZE-byte slots, so a digest of any
+    other size would silently shift every following node.
+
+    Raises:
+        ValueError: If a digest has the wrong size
+    """
+    sizes = set(map(len, digests))
+    if sizes != {NODE_SIZE}:
+        bad = sorted(sizes - {NODE_SIZE})
+        raise ValueError(f"Leaf digests must be {NODE_SIZE} bytes, got {bad}")
+
+
+def _pad_join(nodes: List[bytes]) -> bytes:
+    """
+    Concatenate nodes into a layer buffer, padded for pairing.
+
+    An odd layer (other than the root) gets its last node duplicated in the
+    same allocation, so the buffer is built once at its final size instead of
+    being copied again to pad it.
+    """
+    if len(nodes) > 1 and len(nodes) & 1:
+        nodes.append(nodes[-1])
+    return b''.join(nodes)
+
+
+def _next_layer(layer: bytes, new_hash: Callable[[bytes], HashObject] = _sha256) -> bytes:
+    """Hash a contiguous, even-length layer into its padded parent layer."""
+    return _pad_join(hash_many(new_hash, _pair_buffers(layer)))
+
+
+def build_merkle_root(leaves: List[bytes], hash_name: str = DEFAULT_HASH) -> bytes:
+    """
+    Build Merkle root from raw leaf digests.
+
+    Parent nodes are hashed over the lowercase hex encoding of both children,
+    so published roots are unchanged; only the final root needs hex-encoding.
+
+    Args:
+        leaves: List of leaf digests (32 bytes each)
+        hash_name: Hash algorithm ("sha256" or "blake3")
+
+    Returns:
+        Merkle root digest (32 bytes)
+
+    Raises:
+        ValueError: If leaves list is empty or a leaf is not 32 bytes
+    """
+    if len(leaves) == 0:
+        raise ValueError("Cannot build Merkle tree from empty leaves")
+
+    _check_digests(leaves)
+    new_hash = get_hash(hash_name)
+    layer = _pad_join(list(leaves))
+
+    # Odd layers are padded (duplicate last) as they are built
+    while len(layer) > NODE_SIZE:
+        layer = _next_layer(layer, new_hash)
+
+    return layer
+
+
+def build_merkle_tree(leaves: List[str], hash_name: str = DEFAULT_HASH) -> str:
     """
     Build Merkle tree from leaf hashes.
 
     Args:
-        leaves: List of SHA256 hashes (lowercase hex strings)
+        leaves: List of leaf hashes (lowercase hex strings)
+        hash_name: Hash algorithm ("sha256" or "blake3")
 
     Returns:
         Merkle root as lowercase hex string
 
     Raises:
-        ValueError: If leaves list is empty
+        ValueError: If leaves list is empty or a leaf is not 32 bytes
     """
     if len(leaves) == 0:
         raise ValueError("Cannot build Merkle tree from empty leaves")
@@ -41,22 +233,75 @@ def build_merkle_tree(leaves: List[str]) -> str:
     if len(leaves) == 1:
         return leaves[0]
 
-    # Odd leaf: duplicate last
-    if len(leaves) % 2 == 1:
-        leaves.append(leaves[-1])
+    return build_merkle_root([bytes.fromhex(leaf) for leaf in leaves], hash_name).hex()
+
+
+class MerkleStreamBuilder:
+    """
+    Incremental Merkle root over a stream of leaf digests.
 
-    # Build next level
-    next_level = []
-    for i in range(0, len(leaves), 2):
-        left = leaves[i]
-        right = leaves[i+1]
-        parent = hashlib.sha256(
-            (left + right).encode('utf-8')
-        ).hexdigest()
-        next_level.append(parent)
+    Keeps at most one pending node per tree height, so memory is O(log n)
+    in the number of leaves. Produces the same root as build_merkle_root.
+    """
 
-    # Recurse
-    return build_merkle_tree(next_level)
+    def __init__(self, hash_name: str = DEFAULT_HASH):
+        self._new_hash = get_hash(hash_name)
+        self._stack: List[Tuple[int, bytes]] = []
+        self.count = 0
+
+    def push(self, leaf: bytes) -> None:
+        """
+        Append a leaf digest, merging completed subtrees.
+
+        Args:
+            leaf: Leaf digest (32 bytes)
+
+        Raises:
+            ValueError: If the leaf is not 32 bytes
+        """
+        if len(leaf) != NODE_SIZE:
+            raise ValueError(f"Leaf digests must be {NODE_SIZE} bytes, got {len(leaf)}")
+
+        new_hash = self._new_hash
+        stack = self._stack
+        height = 0
+        node = leaf
+
+        while stack and stack[-1][0] == height:
+            node = new_hash(hexlify(stack.pop()[1] + node)).digest()
+            height += 1
+
+        stack.append((height, node))
+        self.count += 1
+
+    def root(self) -> bytes:
+        """
+        Compute the Merkle root of all leaves pushed so far.
+
+        Pending nodes without a sibling are paired with themselves
+        (duplicate_last), exactly as an odd-length level is padded.
+
+        Returns:
+            Merkle root digest (32 bytes)
+
+        Raises:
+            ValueError: If no leaves were pushed
+        """
+        if not self._stack:
+            raise ValueError("Cannot build Merkle tree from empty leaves")
+
+        new_hash = self._new_hash
+        stack = self._stack.copy()
+        height, node = stack.pop()
+
+        while stack:
+            if stack[-1][0] == height:
+                node = new_hash(hexlify(stack.pop()[1] + node)).digest()
+            else:
+                node = new_hash(hexlify(node + node)).digest()
+            height += 1
+
+        return node
 
 
 class MerkleTree:
@@ -64,56 +309,92 @@ class MerkleTree:
     Merkle tree with proof generation support.
     """
 
-    def __init__(self, leaves: List[str]):
+    def __init__(self, leaves: List[str], hash_name: str = DEFAULT_HASH):
         """
         Build a Merkle tree from leaf hashes.
 
         Args:
-            leaves: List of SHA256 hashes (lowercase hex strings)
+            leaves: List of leaf hashes (lowercase hex strings)
+            hash_name: Hash algorithm ("sha256" or "blake3")
+
+        Raises:
+            ValueError: If leaves list is empty or a leaf is not 32 bytes
         """
         if len(leaves) == 0:
             raise ValueError("Cannot build Merkle tree from empty leaves")
 
-        self.leaves = leaves.copy()
-        self.layers = self._build_tree_layers(leaves)
-        self.root = self.layers[-1][0] if self.layers else leaves[0]
+        self._init_layers([bytes.fromhex(leaf) for leaf in leaves], hash_name)
+
+    @classmethod
+    def from_digests(cls, digests: List[bytes], hash_name: str = DEFAULT_HASH) -> "MerkleTree":
+        """
+        Build a Merkle tree from raw leaf digests.
+
+        Args:
+            digests: List of leaf digests (32 bytes each)
+            hash_name: Hash algorithm ("sha256" or "blake3")
+
+        Returns:
+            MerkleTree instance
+
+        Raises:
+            ValueError: If digests list is empty or a digest is not 32 bytes
+        """
+        if len(digests) == 0:
+            raise ValueError("Cannot build Merkle tree from empty leaves")
 
-    def _build_tree_layers(self, leaves: List[str]) -> List[List[str]]:
+        tree = cls.__new__(cls)
+        tree._init_layers(list(digests), hash_name)
+        return tree
+
+    def _init_layers(self, digests: List[bytes], hash_name: str) -> None:
+        """Build layers from raw digests and derive the root."""
+        _check_digests(digests)
+        self.hash_name = hash_name
+        self.leaf_count = len(digests)
+        self.layers = self._build_tree_layers(_pad_join(digests))
+        self.root = self.layers[-1].hex()
+
+    @property
+    def leaves(self) -> List[str]:
+        """Leaf hashes as lowercase hex strings."""
+        layer = self.layers[0]
+        return [
+            layer[i:i+NODE_SIZE].hex()
+            for i in range(0, self.leaf_count * NODE_SIZE, NODE_SIZE)
+        ]
+
+    def _build_tree_layers(self, leaves: bytes) -> List[bytes]:
         """
         Build all layers of the Merkle tree.
 
+        Each layer is one contiguous buffer of 32-byte digests. Odd layers
+        are padded by duplicating their last node, so every stored node
+        except the root has a sibling.
+
         Args:
-            leaves: List of leaf hashes
+            leaves: Concatenated raw leaf digests, padded to an even count
 
         Returns:
-            List of layers, where each layer is a list of hashes
+            List of layers, from leaves to root
         """
-        layers = [leaves.copy()]
-        current = leaves.copy()
+        new_hash = get_hash(self.hash_name)
+        layers = []
+        current = leaves
 
-        while len(current) > 1:
-            # Odd leaf: duplicate last
-            if len(current) % 2 == 1:
-                current.append(current[-1])
+        # Odd layers are padded (duplicate last) as they are built
+        while len(current) > NODE_SIZE:
+            layers.append(current)
 
             # Build next level
-            next_level = []
-            for i in range(0, len(current), 2):
-                left = current[i]
-                right = current[i+1]
-                parent = hashlib.sha256(
-                    (left + right).encode('utf-8')
-                ).hexdigest()
-                next_level.append(parent)
-
-            layers.append(next_level)
-            current = next_level
+            current = _next_layer(current, new_hash)
 
+        layers.append(current)
         return layers
 
-    def generate_proof(self, leaf_index: int) -> Dict:
+    def generate_compact_proof(self, leaf_index: int) -> Dict:
         """
-        Generate a Merkle proof for a leaf.
+        Generate a compact Merkle proof for a leaf.
 
         Args:
             leaf_index: Index of the leaf in the original leaves list
@@ -122,17 +403,21 @@ class MerkleTree:
             Dictionary containing:
                 - leaf_index: Original index of the leaf
                 - leaf_hash: Hash of the leaf
-                - proof: List of sibling hashes on the path to root
+                - dirs: Direction bitmap; bit k is set when the node at
+                  level k is a left child (sibling on the right)
+                - siblings: Sibling hashes on the path to root, leaf first
                 - expected_root: Expected Merkle root
 
         Raises:
             IndexError: If leaf_index is out of range
         """
-        if leaf_index < 0 or leaf_index >= len(self.leaves):
-            raise IndexError(f"leaf_index {leaf_index} out of range [0, {len(self.leaves)-1}]")
+        if leaf_index < 0 or leaf_index >= self.leaf_count:
+            raise IndexError(f"leaf_index {leaf_index} out of range [0, {self.leaf_count-1}]")
 
-        leaf_hash = self.leaves[leaf_index]
-        proof = []
+        offset = leaf_index * NODE_SIZE
+        leaf_hash = self.layers[0][offset:offset+NODE_SIZE].hex()
+        dirs = 0
+        siblings = []
 
         # Traverse from bottom to top
         current_index = leaf_index
@@ -140,24 +425,16 @@ class MerkleTree:
         for layer_idx in range(len(self.layers) - 1):
             current_layer = self.layers[layer_idx]
 
-            # Determine if current node is left or right child
-            is_left = (current_index % 2 == 0)
-
-            if is_left:
+            if current_index % 2 == 0:
                 # Current node is left, get right sibling
+                dirs |= 1 << layer_idx
                 sibling_index = current_index + 1
             else:
                 # Current node is right, get left sibling
                 sibling_index = current_index - 1
 
-            # Get sibling hash
-            sibling_hash = current_layer[sibling_index]
-
-            # Add to proof
-            proof.append({
-                "direction": "left" if is_left else "right",
-                "sibling_hash": sibling_hash
-            })
+            offset = sibling_index * NODE_SIZE
+            siblings.append(current_layer[offset:offset+NODE_SIZE].hex())
 
             # Move to parent level
             current_index = current_index // 2
@@ -165,12 +442,53 @@ class MerkleTree:
         return {
             "leaf_index": leaf_index,
             "leaf_hash": leaf_hash,
-            "proof": proof,
+            "dirs": dirs,
+            "siblings": siblings,
             "expected_root": self.root
         }
 
+    def generate_proof(self, leaf_index: int) -> Dict:
+        """
+        Generate a Merkle proof for a leaf (legacy list-of-steps format).
 
-def verify_proof(leaf_hash: str, proof: List[Dict], expected_root: str) -> bool:
+        Args:
+            leaf_index: Index of the leaf in the original leaves list
+
+        Returns:
+            Dictionary containing:
+                - leaf_index: Original index of the leaf
+                - leaf_hash: Hash of the leaf
+                - proof: List of sibling hashes on the path to root
+                - expected_root: Expected Merkle root
+
+        Raises:
+            IndexError: If leaf_index is out of range
+        """
+        compact = self.generate_compact_proof(leaf_index)
+        dirs = compact["dirs"]
+
+        proof = [
+            {
+                "direction": "left" if (dirs >> k) & 1 else "right",
+                "sibling_hash": sibling
+            }
+            for k, sibling in enumerate(compact["siblings"])
+        ]
+
+        return {
+            "leaf_index": leaf_index,
+            "leaf_hash": compact["leaf_hash"],
+            "proof": proof,
+            "expected_root": compact["expected_root"]
+        }
+
+
+def verify_proof(
+    leaf_hash: str,
+    proof: List[Dict],
+    expected_root: str,
+    hash_name: str = DEFAULT_HASH
+) -> bool:
     """
     Verify a Merkle proof.
 
@@ -180,10 +498,12 @@ def verify_proof(leaf_hash: str, proof: List[Dict], expected_root: str) -> bool:
             - direction: "left" or "right"
             - sibling_hash: Hash of the sibling node
         expected_root: Expected Merkle root
+        hash_name: Hash algorithm ("sha256" or "blake3")
 
     Returns:
         True if proof is valid, False otherwise
     """
+    new_hash = get_hash(hash_name)
     current = leaf_hash
 
     for step in proof:
@@ -192,12 +512,51 @@ def verify_proof(leaf_hash: str, proof: List[Dict], expected_root: str) -> bool:
 
         if direction == "left":
             # Current is left child
-            current = hashlib.sha256(
+            current = new_hash(
+                (current + sibling).encode('utf-8')
+            ).hexdigest()
+        else:
+            # Current is right child
+            current = new_hash(
+                (sibling + current).encode('utf-8')
+            ).hexdigest()
+
+    return current == expected_root
+
+
+def verify_compact_proof(
+    leaf_hash: str,
+    dirs: int,
+    siblings: List[str],
+    expected_root: str,
+    hash_name: str = DEFAULT_HASH
+) -> bool:
+    """
+    Verify a compact Merkle proof.
+
+    Args:
+        leaf_hash: Hash of the leaf to verify
+        dirs: Direction bitmap; bit k is set when the node at level k is a
+            left child
+        siblings: Sibling hashes on the path to root, leaf first
+        expected_root: Expected Merkle root
+        hash_name: Hash algorithm ("sha256" or "blake3")
+
+    Returns:
+        True if proof is valid, False otherwise
+    """
+    new_hash = get_hash(hash_name)
+    current = leaf_hash
+
+    for k, sibling in enumerate(siblings):
+        if (dirs >> k) & 1:
+            # Current is left child
+            current = new_hash(
                 (current + sibling).encode('utf-8')
             ).hexdigest()
         else:
             # Current is right child
-            current = hashlib.sha256(
+            current = new_hash(
                 (sibling + current).encode('utf-8')
             ).hexdigest()
 
@@ -4,18 +4,43 @@ Normalizers for ledger-publisher.
 Implements field-specific normalization functions.
 """
 
-import json
-import re
-from typing import Any
-
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Reference deterministic JSON implementation from ledger-spec, resolved once.
+# Missing ledger-spec only matters to non-empty deterministic_json_optional values.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'ledger-spec'))
+_deterministic_json_error: Optional[ImportError] = None
+try:
+    from reference_impl import deterministic_json as _deterministic_json
+except ImportError as e:
+    _deterministic_json = None
+    _deterministic_json_error = e
+
+# Deletes lowercase hex digits; anything left over is not hex. Built once,
+# since maketrans is comparatively expensive.
+_HEX_DROP = str.maketrans('', '', '0123456789abcdef')
+
+_UTC = timezone.utc
+
+# Value of optional fields that are missing or empty
+_EMPTY = ""
 
 def trim_ascii(value: str) -> str:
     """Remove leading/trailing ASCII whitespace."""
+    # Bare strip() (all Unicode whitespace) is what canonical bytes under
+    # core_spec 1.2.1 were built with; narrowing it would change leaf hashes.
     return value.strip()
 
 
 def lower(value: str) -> str:
     """Convert to lowercase."""
+    # No islower() precheck here or in the other lower* normalizers:
+    # str.lower() copies ASCII via a fast path, while islower() does a
+    # per-character Unicode lookup and is several times slower.
     return value.lower()
 
 
@@ -24,10 +49,14 @@ def upper(value: str) -> str:
     return value.upper()
 
 
+@lru_cache(maxsize=4096)
 def idna_lower_strip_trailing_dot(value: str) -> str:
     """
     IDNA encode domain, convert to lowercase, remove trailing dot.
 
+    Results are cached, since records repeat a small set of domains and the
+    idna codec is slow.
+
     Example: EXAMPLE.COM → example.com
     """
     # IDNA encode
@@ -37,14 +66,8 @@ def idna_lower_strip_trailing_dot(value: str) -> str:
         # Fallback if already ASCII
         encoded = value
 
-    # Lowercase
-    encoded = encoded.lower()
-
-    # Remove trailing dot
-    if encoded.endswith('.'):
-        encoded = encoded[:-1]
-
-    return encoded
+    # Lowercase, remove (one) trailing dot
+    return encoded.lower().removesuffix('.')
 
 
 def lower_hex(value: str) -> str:
@@ -54,7 +77,7 @@ def lower_hex(value: str) -> str:
     Example: 0XABC...123 → 0xabc...123
     """
     value = value.lower()
-    if not re.match(r'^0x[0-9a-f]{64}$', value):
+    if len(value) != 66 or value[0] != '0' or value[1] != 'x' or value[2:].translate(_HEX_DROP):
         raise ValueError(f"Invalid hex format: {value}")
     return value
 
@@ -66,9 +89,9 @@ def lower_address_optional(value: str) -> str:
     Optional: empty string returns empty string.
     """
     if not value:
-        return ""
+        return _EMPTY
     value = value.lower()
-    if not re.match(r'^0x[0-9a-f]{40}$', value):
+    if len(value) != 42 or value[0] != '0' or value[1] != 'x' or value[2:].translate(_HEX_DROP):
         raise ValueError(f"Invalid address format: {value}")
     return value
 
@@ -79,20 +102,29 @@ def iso8601_to_utc(value: str) -> str:
 
     Example: 2026-01-17T10:30:00+08:00 → 2026-01-17T02:30:00Z
     """
-    from datetime import datetime, timezone
+    # Fast path: already RFC3339 UTC (YYYY-MM-DDTHH:MM:SSZ). Parsing the
+    # naive part still rejects invalid dates and times.
+    if (len(value) == 20 and value[19] == 'Z' and value[10] == 'T'
+            and value[4] == '-' and value[7] == '-'
+            and value[13] == ':' and value[16] == ':'):
+        datetime.fromisoformat(value[:19])
+        return value
 
     # Parse ISO8601 string
     # Handle 'Z' suffix (UTC)
     if value.endswith('Z'):
-        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        dt = datetime.fromisoformat(value[:-1] + '+00:00')
     else:
         dt = datetime.fromisoformat(value)
 
     # Convert to UTC
-    dt_utc = dt.astimezone(timezone.utc)
+    dt_utc = dt.astimezone(_UTC)
 
-    # Format as RFC3339
-    return dt_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+    # Format as RFC3339 (fixed shape, so no strftime format parsing)
+    return (
+        f"{dt_utc.year:04d}-{dt_utc.month:02d}-{dt_utc.day:02d}"
+        f"T{dt_utc.hour:02d}:{dt_utc.minute:02d}:{dt_utc.second:02d}Z"
+    )
 
 
 def decimal_string(value: str) -> str:
@@ -101,7 +133,8 @@ def decimal_string(value: str) -> str:
 
     Example: "123.45" → "123.45"
     """
-    if not re.match(r'^[0-9]+(\.[0-9]+)?$', value):
+    head, dot, tail = value.partition('.')
+    if not (head.isascii() and head.isdigit() and (not dot or (tail.isascii() and tail.isdigit()))):
         raise ValueError(f"Invalid decimal string: {value}")
     return value
 
@@ -109,7 +142,7 @@ def decimal_string(value: str) -> str:
 def decimal_string_optional(value: str) -> str:
     """Optional version of decimal_string."""
     if not value:
-        return ""
+        return _EMPTY
     return decimal_string(value)
 
 
@@ -125,14 +158,14 @@ def lower_enum(value: str) -> str:
 def trim_ascii_optional(value: str) -> str:
     """Optional version of trim_ascii."""
     if not value:
-        return ""
+        return _EMPTY
     return trim_ascii(value)
 
 
 def lower_enum_optional(value: str) -> str:
     """Optional version of lower_enum."""
     if not value:
-        return ""
+        return _EMPTY
     return lower_enum(value)
 
 
@@ -141,18 +174,68 @@ def deterministic_json_optional(value: Any) -> str:
     Convert to deterministic JSON (optional field).
 
     Uses reference implementation from ledger-spec.
+
+    Raises:
+        ImportError: If value is non-empty and ledger-spec is missing
     """
     if not value:
-        return ""
+        return _EMPTY
+
+    if _deterministic_json is None:
+        raise ImportError(
+            "deterministic_json_optional requires ledger-spec reference_impl"
+        ) from _deterministic_json_error
+
+    result: str = _deterministic_json(value)
+    return result
+
+
+# Normalizer registry, built once at import
+_NORMALIZERS: Dict[str, Callable[[Any], Any]] = {
+    'trim_ascii': trim_ascii,
+    'lower': lower,
+    'upper': upper,
+    'idna_lower_strip_trailing_dot': idna_lower_strip_trailing_dot,
+    'lower_hex': lower_hex,
+    'lower_address_optional': lower_address_optional,
+    'iso8601_to_utc': iso8601_to_utc,
+    'decimal_string': decimal_string,
+    'decimal_string_optional': decimal_string_optional,
+    'lower_enum': lower_enum,
+    'lower_enum_optional': lower_enum_optional,
+    'trim_ascii_optional': trim_ascii_optional,
+    'deterministic_json_optional': deterministic_json_optional,
+}
+
+# Normalizers that map empty values to ""
+_OPTIONAL_NAMES = frozenset(name for name in _NORMALIZERS if name.endswith('_optional'))
+
+# Normalizers that are a single str method, mapped directly in apply_batch
+_STR_METHODS: Dict[str, Callable[[str], str]] = {
+    'lower': str.lower,
+    'upper': str.upper,
+    'lower_enum': str.lower,
+    'trim_ascii': str.strip,
+}
+
+
+def get_normalizer(normalizer_name: str) -> Callable[[Any], Any]:
+    """
+    Look up a normalizer function by name.
 
-    # Import reference implementation
-    import sys
-    from pathlib import Path
-    spec_path = Path(__file__).resolve().parents[2] / 'ledger-spec'
-    sys.path.insert(0, str(spec_path))
-    from reference_impl import deterministic_json
+    Args:
+        normalizer_name: Name of the normalizer function
 
-    return deterministic_json(value)
+    Returns:
+        Normalizer function
+
+    Raises:
+        ValueError: If the normalizer is unknown
+    """
+    normalizer = _NORMALIZERS.get(normalizer_name)
+    if normalizer is None:
+        raise ValueError(f"Unknown normalizer: {normalizer_name}")
+    return normalizer
 
 
 def apply(normalizer_name: str, value: Any) -> Any:
@@ -165,31 +248,44 @@ def apply(normalizer_name: str, value: Any) -> Any:
 
     Returns:
         Normalized value
-    """
-    normalizers_map = {
-        'trim_ascii': trim_ascii,
-        'lower': lower,
-        'upper': upper,
-        'idna_lower_strip_trailing_dot': idna_lower_strip_trailing_dot,
-        'lower_hex': lower_hex,
-        'lower_address_optional': lower_address_optional,
-        'iso8601_to_utc': iso8601_to_utc,
-        'decimal_string': decimal_string,
-        'decimal_string_optional': decimal_string_optional,
-        'lower_enum': lower_enum,
-        'lower_enum_optional': lower_enum_optional,
-        'trim_ascii_optional': trim_ascii_optional,
-        'deterministic_json_optional': deterministic_json_optional,
-    }
-
-    if normalizer_name not in normalizers_map:
-        raise ValueError(f"Unknown normalizer: {normalizer_name}")
 
-    normalizer = normalizers_map[normalizer_name]
+    Raises:
+        ValueError: If the normalizer is unknown
+    """
+    normalizer = get_normalizer(normalizer_name)
 
     # Handle optional normalizers
-    if normalizer_name.endswith('_optional'):
-        if not value:
-            return ""
+    if normalizer_name in _OPTIONAL_NAMES and not value:
+        return _EMPTY
 
     return normalizer(value)
+
+
+def apply_batch(normalizer_name: str, values: Sequence[Any]) -> List[Any]:
+    """
+    Apply a normalizer by name to a column of values.
+
+    Resolves the normalizer once; simple string normalizers are mapped
+    without a Python-level call per value.
+
+    Args:
+        normalizer_name: Name of the normalizer function
+        values: Values to normalize
+
+    Returns:
+        Normalized values, in input order
+
+    Raises:
+        ValueError: If the normalizer is unknown
+    """
+    normalizer = get_normalizer(normalizer_name)
+
+    method = _STR_METHODS.get(normalizer_name)
+    if method is not None:
+        return list(map(method, values))
+
+    # Handle optional normalizers
+    if normalizer_name in _OPTIONAL_NAMES:
+        return [normalizer(value) if value else _EMPTY for value in values]
+
+    return list(map(normalizer, values))
@@ -0,0 +1,24 @@
+"""
+Setuptools hook for ledger-publisher.
+
+Project metadata lives in pyproject.toml. Setting LEDGER_PUBLISHER_MYPYC=1
+additionally compiles builder/normalizers.py with mypyc; the pure-Python
+module is used whenever the extension is not built.
+"""
+
+import os
+
+from setuptools import setup
+
+ext_modules = []
+if os.environ.get("LEDGER_PUBLISHER_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify([
+        "--follow-imports=silent",
+        "--ignore-missing-imports",
+        "--no-warn-return-any",
+        "builder/normalizers.py",
+    ])
+
+setup(ext_modules=ext_modules)
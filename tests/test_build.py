@@ -0,0 +1,379 @@
+"""
+Test bundle building: JSON output, record loading and proof files.
+"""
+
+import json
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from builder import build, generate_proofs, jsonio, merkle, normalizers
+
+PROFILE = {
+    "profile_id": "test-payments",
+    "profile_version": "1.0.0",
+    "required_fields": ["domain", "chain", "txid", "timestamp", "currency", "amount"],
+    "canonical_fields": [
+        "domain", "chain", "txid", "timestamp", "currency", "amount",
+        "from", "to", "purpose", "order_id", "memo"
+    ],
+    "normalizers": {
+        "domain": "idna_lower_strip_trailing_dot",
+        "chain": "lower_enum",
+        "txid": "lower_hex",
+        "timestamp": "iso8601_to_utc",
+        "currency": "upper",
+        "amount": "decimal_string",
+        "from": "lower_address_optional",
+        "to": "lower_address_optional",
+        "purpose": "lower_enum_optional",
+        "order_id": "trim_ascii",
+        "memo": "trim_ascii_optional"
+    },
+    "sort_keys": ["timestamp", "txid", "canonical_bytes"]
+}
+
+
+def make_records(count):
+    """Sample records accepted by PROFILE."""
+    return [
+        {
+            "domain": "Example.COM.",
+            "chain": "Base",
+            "txid": f"0x{i:064x}",
+            "timestamp": f"2026-01-17T10:{i % 60:02d}:00+08:00",
+            "currency": "usd",
+            "amount": f"{i}.50",
+            "from": f"0x{i:040x}",
+            "order_id": f" ORDER-{i:04d} "
+        }
+        for i in range(count)
+    ]
+
+
+def build_test_bundle(tmp, records, **kwargs):
+    """Build a bundle from records with PROFILE under tmp; return its directory."""
+    profile_dir = tmp / "profiles"
+    (profile_dir / PROFILE["profile_id"]).mkdir(parents=True)
+    (profile_dir / PROFILE["profile_id"] / "profile.json").write_text(json.dumps(PROFILE))
+
+    input_file = tmp / "records.jsonl"
+    input_file.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    result = build.build_bundle(
+        input_file, profile_dir, PROFILE["profile_id"], "2026-01-17", tmp / "dist", **kwargs
+    )
+    return result["bundle_dir"]
+
+
+def test_jsonio_backends():
+    """Test that published bytes do not depend on whether orjson is installed."""
+    print("🧪 Test 1: JSON backends")
+
+    plain = {
+        "leaf_index": 3,
+        "dirs": 2**63 - 1,
+        "siblings": ["ab" * 32, "cd" * 32],
+        "nested": {"é": "✓ \"q\"\n\x1f", "empty": [], "none": None, "flag": True},
+    }
+    mixed = {"a": 1e16, "b": 1e-07, "c": float("nan"), "d": 2**70, "e": 0.1}
+
+    saved = jsonio.orjson
+    outputs = []
+    try:
+        for backend in (saved, None):
+            jsonio.orjson = backend
+            outputs.append((
+                jsonio.dumps_line(plain, plain=True),
+                jsonio.dumps_pretty(plain, plain=True),
+                bytes(jsonio.dumps_lines([plain, plain], plain=True)),
+                jsonio.dumps_line(mixed),
+                jsonio.dumps_pretty(mixed),
+            ))
+    finally:
+        jsonio.orjson = saved
+
+    if outputs[0] != outputs[1]:
+        print("   ❌ Output differs between orjson and the standard library")
+        return False
+
+    # Arbitrary values always go through the standard library, in its default format
+    expected = json.dumps(mixed).encode('ascii')
+    if outputs[0][3] != expected:
+        print(f"   ❌ Unexpected encoding of floats/big ints: {outputs[0][3]!r}")
+        return False
+
+    print(f"   orjson installed: {saved is not None}")
+    print("   ✅ Identical bytes with and without orjson\n")
+    return True
+
+
+def test_large_integers_preserved():
+    """Test that integers beyond 64 bits are published unchanged."""
+    print("🧪 Test 2: Large integers in records")
+
+    records = make_records(3)
+    records[1]["value_wei"] = 123456789012345678901234567890
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_dir = build_test_bundle(Path(tmp), records)
+        published = (bundle_dir / "records-000.jsonl").read_text(encoding="utf-8")
+
+    if '"value_wei": 123456789012345678901234567890' not in published:
+        print("   ❌ value_wei was not published unchanged")
+        return False
+
+    print("   ✅ value_wei round-trips exactly\n")
+    return True
+
+
+def test_records_format():
+    """Test that records files keep json.dumps format, escaping non-ASCII text."""
+    print("🧪 Test 3: Records file format")
+
+    records = make_records(3)
+    records[0]["note"] = "\ud800 lone surrogate"
+    records[1]["memo"] = "café ✓"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_dir = build_test_bundle(Path(tmp), records)
+        published = (bundle_dir / "records-000.jsonl").read_bytes()
+
+    lines = published.decode("ascii").splitlines()
+    expected = sorted(json.dumps(json.loads(line)) for line in lines)
+    if sorted(lines) != expected or len(lines) != 3:
+        print("   ❌ Records not in json.dumps format")
+        return False
+
+    if b'"note": "\\ud800 lone surrogate"' not in published:
+        print("   ❌ Lone surrogate not published escaped")
+        return False
+
+    print("   ✅ Records published in json.dumps format\n")
+    return True
+
+
+def test_deterministic_json_without_ledger_spec():
+    """Test that empty deterministic_json_optional fields build without ledger-spec."""
+    print("🧪 Test 4: deterministic_json_optional without ledger-spec")
+
+    saved = normalizers._deterministic_json
+    normalizers._deterministic_json = None
+    try:
+        PROFILE["normalizers"]["meta"] = "deterministic_json_optional"
+        records = make_records(3)
+        records[1]["meta"] = {}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            build_test_bundle(Path(tmp), records)
+
+        records[2]["meta"] = {"source": "api"}
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                build_test_bundle(Path(tmp), records)
+        except ImportError:
+            pass
+        else:
+            print("   ❌ Non-empty value normalized without ledger-spec")
+            return False
+    finally:
+        del PROFILE["normalizers"]["meta"]
+        normalizers._deterministic_json = saved
+
+    print("   ✅ Only non-empty values require ledger-spec\n")
+    return True
+
+
+def test_parallel_prepare():
+    """Test that records prepared in a process pool give the in-process bundle."""
+    print("🧪 Test 5: Parallel record preparation")
+
+    records = make_records(250)
+    records.reverse()
+
+    saved = build.PARALLEL_MIN_RECORDS, build.PARALLEL_WORKERS
+    outputs = []
+    try:
+        for min_records, workers in ((len(records) + 1, 1), (0, 3)):
+            build.PARALLEL_MIN_RECORDS = min_records
+            build.PARALLEL_WORKERS = workers
+            with tempfile.TemporaryDirectory() as tmp:
+                bundle_dir = build_test_bundle(Path(tmp), records)
+                outputs.append((
+                    (bundle_dir / "daily_root.txt").read_bytes(),
+                    (bundle_dir / "records-000.jsonl").read_bytes(),
+                ))
+    finally:
+        build.PARALLEL_MIN_RECORDS, build.PARALLEL_WORKERS = saved
+
+    if outputs[0] != outputs[1]:
+        print("   ❌ Pool output differs from in-process output")
+        return False
+
+    print(f"   Daily root: {outputs[0][0].decode().strip()}")
+    print("   ✅ Pool and in-process bundles match\n")
+    return True
+
+
+def read_proof_files(bundle_dir):
+    """Map each proof file name to its bytes, including proof_index.json."""
+    files = {p.name: p.read_bytes() for p in (bundle_dir / "proofs").iterdir()}
+    files["proof_index.json"] = (bundle_dir / "proof_index.json").read_bytes()
+    return files
+
+
+def test_sharded_proofs():
+    """Test sharded proof files: pool output matches serial and proofs resolve."""
+    print("🧪 Test 6: Sharded proofs")
+
+    records = make_records(45)
+    shard_size = 7
+
+    saved = generate_proofs.PARALLEL_MIN_PROOFS, generate_proofs.PARALLEL_WORKERS
+    outputs = []
+    try:
+        for min_proofs, workers in ((len(records) + 1, 1), (0, 2)):
+            generate_proofs.PARALLEL_MIN_PROOFS = min_proofs
+            generate_proofs.PARALLEL_WORKERS = workers
+            with tempfile.TemporaryDirectory() as tmp:
+                bundle_dir = build_test_bundle(Path(tmp), records, proof_shard_size=shard_size)
+                outputs.append(read_proof_files(bundle_dir))
+    finally:
+        generate_proofs.PARALLEL_MIN_PROOFS, generate_proofs.PARALLEL_WORKERS = saved
+
+    if outputs[0] != outputs[1]:
+        print("   ❌ Pool output differs from serial output")
+        return False
+
+    files = outputs[0]
+    index = json.loads(files["proof_index.json"])
+    if len(files) != 45 // shard_size + 2:
+        print(f"   ❌ Unexpected proof files: {sorted(files)}")
+        return False
+
+    for entry in index["proofs"]:
+        shard = json.loads(files[f"shard-{entry['shard']:03d}.json"])
+        proof = shard[str(entry["record_index"])]
+        if proof["leaf_hash"] != entry["leaf_hash"] or not merkle.verify_compact_proof(
+            proof["leaf_hash"], proof["dirs"], proof["siblings"], index["merkle_root"]
+        ):
+            print(f"   ❌ Proof for record {entry['record_index']} did not resolve")
+            return False
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            build_test_bundle(Path(tmp), records, proof_shard_size=-5)
+    except ValueError:
+        pass
+    else:
+        print("   ❌ Negative shard size accepted")
+        return False
+
+    print(f"   ✅ {len(index['proofs'])} proofs resolved via proof_index, pool == serial\n")
+    return True
+
+
+def loop_canonicalize(record, profile):
+    """Per-field loop the generated normalize/canonicalize functions replace."""
+    normalized = {}
+    for field, normalizer_name in profile["normalizers"].items():
+        if field in record or normalizer_name.endswith("_optional"):
+            value = record.get(field, "")
+            normalized[field] = normalizers.apply(normalizer_name, value)
+
+    for field in profile["canonical_fields"]:
+        if field not in normalized:
+            normalized[field] = ""
+
+    separator = profile.get("canonical_record_separator", "|")
+    line_ending = profile.get("canonical_line_ending", "\n")
+    canonical = separator.join(normalized.get(f, "") for f in profile["canonical_fields"])
+    return normalized, canonical + line_ending
+
+
+def test_compiled_profile():
+    """Test that generated normalize/canonicalize match the per-field loop."""
+    print("🧪 Test 7: Compiled profile")
+
+    profile = dict(PROFILE)
+    profile["normalizers"] = {
+        field: name for field, name in PROFILE["normalizers"].items() if field != "purpose"
+    }
+    # Normalized but not canonical, and canonical without a normalizer
+    profile["normalizers"]["source"] = "upper"
+    profile["canonical_fields"] = PROFILE["canonical_fields"] + ["note"]
+
+    records = make_records(4)
+    records[0]["memo"] = "  hello "
+    records[0]["source"] = "api"
+    records[1]["memo"] = ""
+    records[1]["to"] = ""
+    records[2]["purpose"] = "Payment"
+    records[2]["note"] = "kept as is"
+    records[3]["to"] = "0x" + "AB" * 20
+
+    for separator, line_ending in (("|", "\n"), ("\t", ""), (" || ", "\r\n")):
+        profile["canonical_record_separator"] = separator
+        profile["canonical_line_ending"] = line_ending
+        ctx = build.compile_profile(profile)
+        for i, record in enumerate(records):
+            expected = loop_canonicalize(record, profile)
+            actual = (build.normalize_record(record, ctx), build.canonicalize_record(record, ctx))
+            if actual != expected:
+                print(f"   ❌ Record {i} with separator {separator!r}: {actual} != {expected}")
+                return False
+
+    # Generated functions are rebuilt, not pickled, for pool workers
+    restored = pickle.loads(pickle.dumps(ctx))
+    if restored != ctx or restored.canonicalize(records[0]) != ctx.canonicalize(records[0]):
+        print("   ❌ Pickled profile differs")
+        return False
+
+    print("   ✅ Generated functions match the per-field loop\n")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Build Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_jsonio_backends,
+        test_large_integers_preserved,
+        test_records_format,
+        test_deterministic_json_without_ledger_spec,
+        test_parallel_prepare,
+        test_sharded_proofs,
+        test_compiled_profile
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"   ❌ Test failed with exception: {e}\n")
+            failed += 1
+
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
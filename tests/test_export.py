@@ -0,0 +1,143 @@
+"""
+Test the domain-onchain-payments CSV adapter.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from adapters.domain_onchain_payments.export import export_from_csv
+
+HEADER = "domain,chain,txid,timestamp,currency,amount,from,memo\n"
+
+
+def test_export_rows():
+    """Test exported records, including optional and short rows."""
+    print("🧪 Test 1: CSV export")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = Path(tmp) / "input.csv"
+        output_file = Path(tmp) / "records.jsonl"
+        csv_file.write_text(
+            HEADER
+            + "example.com,base,0xab,2026-01-17T10:00:00Z,USD,1.50,0xcd,hi\n"
+            + ",,,,,,,\n"
+            + "example.com,base,0xef,2026-01-17T10:01:00Z,USD,2.00,,\n"
+            + "example.com,base,0x12,2026-01-17T10:02:00Z\n",
+            encoding="utf-8"
+        )
+
+        export_from_csv(str(csv_file), str(output_file))
+        records = [json.loads(line) for line in output_file.read_text(encoding="utf-8").splitlines()]
+
+    expected = [
+        {"domain": "example.com", "chain": "base", "txid": "0xab",
+         "timestamp": "2026-01-17T10:00:00Z", "currency": "USD", "amount": "1.50",
+         "from": "0xcd", "memo": "hi"},
+        {"domain": "example.com", "chain": "base", "txid": "0xef",
+         "timestamp": "2026-01-17T10:01:00Z", "currency": "USD", "amount": "2.00"},
+        # Short row: missing required columns are null, missing optional ones omitted
+        {"domain": "example.com", "chain": "base", "txid": "0x12",
+         "timestamp": "2026-01-17T10:02:00Z", "currency": None, "amount": None},
+    ]
+
+    if records != expected:
+        print(f"   ❌ Unexpected records: {records}")
+        return False
+
+    print(f"   ✅ Exported {len(records)} records as expected\n")
+    return True
+
+
+def test_missing_required_column():
+    """Test that a missing required column fails without touching the output."""
+    print("🧪 Test 2: Missing required column")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = Path(tmp) / "input.csv"
+        output_file = Path(tmp) / "records.jsonl"
+        csv_file.write_text(
+            "domain,chain,txid,timestamp,currency\n"
+            "example.com,base,0xab,2026-01-17T10:00:00Z,USD\n",
+            encoding="utf-8"
+        )
+        output_file.write_bytes(b'{"previous":"export"}\n')
+
+        try:
+            export_from_csv(str(csv_file), str(output_file))
+        except KeyError as e:
+            if e.args != ("amount",):
+                print(f"   ❌ Unexpected missing column: {e}")
+                return False
+        else:
+            print("   ❌ Missing column accepted")
+            return False
+
+        if output_file.read_bytes() != b'{"previous":"export"}\n':
+            print("   ❌ Existing output was overwritten")
+            return False
+
+    print("   ✅ KeyError raised, existing output intact\n")
+    return True
+
+
+def test_empty_csv():
+    """Test that an empty CSV exports an empty file."""
+    print("🧪 Test 3: Empty CSV")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = Path(tmp) / "input.csv"
+        output_file = Path(tmp) / "records.jsonl"
+        csv_file.write_text("", encoding="utf-8")
+        output_file.write_bytes(b'{"previous":"export"}\n')
+
+        export_from_csv(str(csv_file), str(output_file))
+
+        if output_file.read_bytes() != b"":
+            print("   ❌ Output is not empty")
+            return False
+
+    print("   ✅ Empty CSV exported as empty file\n")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Export Adapter Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_export_rows,
+        test_missing_required_column,
+        test_empty_csv
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"   ❌ Test failed with exception: {e}\n")
+            failed += 1
+
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -2,6 +2,7 @@
 Test Merkle proof generation and verification.
 """
 
+import hashlib
 import json
 import sys
 from pathlib import Path
@@ -10,7 +11,18 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "ledger-spec"))
 
-from builder.merkle import MerkleTree, verify_proof, compute_leaf
+from builder import merkle
+from builder.merkle import (
+    MerkleTree,
+    build_merkle_root,
+    build_merkle_tree,
+    compute_leaf,
+    compute_leaf_digest,
+    compute_leaf_many,
+    MerkleStreamBuilder,
+    verify_compact_proof,
+    verify_proof,
+)
 from reference_impl import deterministic_json
 
 
@@ -19,12 +31,7 @@ def test_merkle_proof_small():
     print("🧪 Test 1: Small tree (4 leaves)")
 
     # Create sample leaves (use even number to avoid duplicate complexity)
-    leaves = [
-        compute_leaf("record1"),
-        compute_leaf("record2"),
-        compute_leaf("record3"),
-        compute_leaf("record4")
-    ]
+    leaves = [compute_leaf(b"record%d" % i) for i in range(1, 5)]
 
     # Build tree
     tree = MerkleTree(leaves)
@@ -54,16 +61,18 @@ def test_merkle_proof_large():
     """Test Merkle proof with larger tree."""
     print("🧪 Test 2: Large tree (100 leaves)")
 
-    # Create 100 sample leaves
-    leaves = []
-    for i in range(100):
-        record = {"index": str(i), "data": f"record_{i}"}  # Convert index to string
-        canonical = deterministic_json(record)
-        leaf = compute_leaf(canonical)
-        leaves.append(leaf)
+    # Create 100 sample leaves: canonicalize all records, then hash in bulk
+    records = [{"index": str(i), "data": f"record_{i}"} for i in range(100)]  # Index as string
+    canonicals = [deterministic_json(record).encode('utf-8') for record in records]
+    leaves = compute_leaf_many(canonicals)
 
     # Build tree
-    tree = MerkleTree(leaves)
+    tree = MerkleTree.from_digests(leaves)
+
+    # Bulk hashing must match per-record hashing
+    if tree.leaves[0] != compute_leaf(deterministic_json(records[0])):
+        print("   ❌ Bulk leaf hash differs from compute_leaf")
+        return False
 
     print(f"   Merkle root: {tree.root}")
 
@@ -93,7 +102,7 @@ def test_proof_structure():
     """Test that proof has correct structure."""
     print("🧪 Test 3: Proof structure validation")
 
-    leaves = [compute_leaf(f"record{i}") for i in range(10)]
+    leaves = [compute_leaf(b"record%d" % i) for i in range(10)]
     tree = MerkleTree(leaves)
 
     proof = tree.generate_proof(0)
@@ -120,7 +129,7 @@ def test_tampering_detection():
     """Test that proof verification detects tampering."""
     print("🧪 Test 4: Tampering detection")
 
-    leaves = [compute_leaf(f"record{i}") for i in range(10)]
+    leaves = [compute_leaf(b"record%d" % i) for i in range(10)]
     tree = MerkleTree(leaves)
 
     # Generate valid proof
@@ -140,7 +149,7 @@ def test_tampering_detection():
     print("   ✅ Valid proof accepted")
 
     # Test with tampered leaf
-    tampered_hash = compute_leaf("TAMPERED_DATA")
+    tampered_hash = compute_leaf(b"TAMPERED_DATA")
     is_valid = verify_proof(
         tampered_hash,
         proof["proof"],
@@ -155,6 +164,194 @@ def test_tampering_detection():
     return True
 
 
+def test_odd_leaf_count():
+    """Test proofs and roots for trees with an odd number of leaves."""
+    print("🧪 Test 5: Odd leaf count (7 leaves)")
+
+    leaves = [compute_leaf(f"record{i}") for i in range(7)]
+    tree = MerkleTree(leaves)
+
+    # Hex and raw-digest entry points must agree
+    digests = [compute_leaf_digest(f"record{i}") for i in range(7)]
+    assert build_merkle_tree(leaves) == tree.root, "build_merkle_tree root mismatch"
+    assert build_merkle_root(digests).hex() == tree.root, "build_merkle_root mismatch"
+    assert MerkleTree.from_digests(digests).root == tree.root, "from_digests root mismatch"
+
+    for i in range(len(leaves)):
+        proof = tree.generate_proof(i)
+        if not verify_proof(proof["leaf_hash"], proof["proof"], proof["expected_root"]):
+            print(f"   ❌ Proof for leaf {i} FAILED")
+            return False
+
+    print("   ✅ All proofs verified\n")
+    return True
+
+
+def test_stream_builder():
+    """Test that the streaming root matches the full tree root."""
+    print("🧪 Test 6: Streaming root (1-64 leaves)")
+
+    for count in range(1, 65):
+        digests = [compute_leaf_digest(f"record{i}") for i in range(count)]
+
+        stream = MerkleStreamBuilder()
+        for digest in digests:
+            stream.push(digest)
+
+        if stream.root() != build_merkle_root(digests):
+            print(f"   ❌ Streaming root mismatch for {count} leaves")
+            return False
+
+    print("   ✅ Streaming roots match\n")
+    return True
+
+
+def test_compact_proof():
+    """Test compact proof generation, verification and tampering detection."""
+    print("🧪 Test 7: Compact proofs (11 leaves)")
+
+    leaves = [compute_leaf(f"record{i}") for i in range(11)]
+    tree = MerkleTree(leaves)
+
+    for i in range(len(leaves)):
+        proof = tree.generate_compact_proof(i)
+        legacy = tree.generate_proof(i)
+
+        # Same path as the legacy format
+        assert proof["siblings"] == [step["sibling_hash"] for step in legacy["proof"]]
+
+        if not verify_compact_proof(
+            proof["leaf_hash"],
+            proof["dirs"],
+            proof["siblings"],
+            proof["expected_root"]
+        ):
+            print(f"   ❌ Compact proof for leaf {i} FAILED")
+            return False
+
+    # Flipping a direction bit must break the proof
+    proof = tree.generate_compact_proof(3)
+    if verify_compact_proof(proof["leaf_hash"], proof["dirs"] ^ 1, proof["siblings"], proof["expected_root"]):
+        print("   ❌ Tampered compact proof ACCEPTED (should fail)")
+        return False
+
+    print("   ✅ Compact proofs verified\n")
+    return True
+
+
+def test_leaf_size_validation():
+    """Test that leaves which are not 32-byte digests are rejected."""
+    print("🧪 Test 9: Leaf size validation")
+
+    bad_inputs = [
+        lambda: MerkleTree(["ab" * 16, "cd" * 16, "ef" * 16]),
+        lambda: MerkleTree([compute_leaf("record1"), "ab" * 33]),
+        lambda: MerkleTree.from_digests([compute_leaf_digest("record1"), b"short"]),
+        lambda: build_merkle_root([compute_leaf_digest("record1"), b"x" * 64]),
+        lambda: MerkleStreamBuilder().push(b"short"),
+        lambda: MerkleStreamBuilder().push(compute_leaf_digest("record1") * 2),
+    ]
+
+    for i, make in enumerate(bad_inputs):
+        try:
+            make()
+        except ValueError:
+            continue
+        print(f"   ❌ Invalid leaf size accepted (case {i})")
+        return False
+
+    print("   ✅ Invalid leaf sizes rejected\n")
+    return True
+
+
+def test_sha256_backend():
+    """Test that leaf and node hashing use OpenSSL's SHA256."""
+    print("🧪 Test 8: SHA256 backend")
+
+    # OpenSSL hash objects come from _hashlib, the builtin ones from _sha256
+    backend = type(hashlib.sha256()).__module__
+    if merkle.SHA256_OPENSSL != (backend == "_hashlib"):
+        print(f"   ❌ SHA256_OPENSSL is {merkle.SHA256_OPENSSL}, hashlib uses {backend}")
+        return False
+
+    if not merkle.SHA256_OPENSSL:
+        print(f"   ❌ SHA256 served by {backend}, expected _hashlib (no SHA-NI path)")
+        return False
+
+    if compute_leaf("record") != hashlib.sha256(b"record").hexdigest():
+        print("   ❌ compute_leaf differs from hashlib.sha256")
+        return False
+
+    if compute_leaf(b"record") != compute_leaf("record"):
+        print("   ❌ compute_leaf differs for bytes and str input")
+        return False
+
+    left, right = compute_leaf("left"), compute_leaf("right")
+    expected = hashlib.sha256((left + right).encode("ascii")).digest()
+    if build_merkle_root([bytes.fromhex(left), bytes.fromhex(right)]) != expected:
+        print("   ❌ Node hash differs from hashlib.sha256")
+        return False
+
+    print("   ✅ SHA256 served by OpenSSL\n")
+    return True
+
+
+def test_blake3_proofs():
+    """Test that BLAKE3 trees follow the same hashing rule and proofs verify."""
+    print("🧪 Test 10: BLAKE3 proofs")
+
+    if merkle.blake3 is None:
+        print("   ⏭️  blake3 not installed, skipped\n")
+        return True
+
+    blake3 = merkle.blake3.blake3
+    canonicals = [b"record%d" % i for i in range(1, 8)]
+    leaves = [blake3(c).hexdigest() for c in canonicals]
+
+    # Reference root: parent = H(left_hex + right_hex), duplicate_last padding
+    layer = leaves
+    while len(layer) > 1:
+        if len(layer) % 2:
+            layer = layer + [layer[-1]]
+        layer = [
+            blake3((layer[i] + layer[i + 1]).encode("ascii")).hexdigest()
+            for i in range(0, len(layer), 2)
+        ]
+    expected_root = layer[0]
+
+    if compute_leaf_many(canonicals, "blake3") != [bytes.fromhex(h) for h in leaves]:
+        print("   ❌ compute_leaf_many differs from blake3")
+        return False
+
+    tree = MerkleTree(leaves, "blake3")
+    digests = compute_leaf_many(canonicals, "blake3")
+    roots = {
+        tree.root,
+        MerkleTree.from_digests(digests, "blake3").root,
+        build_merkle_root(digests, "blake3").hex(),
+    }
+    if roots != {expected_root}:
+        print(f"   ❌ BLAKE3 roots disagree: {roots} vs {expected_root}")
+        return False
+
+    for i in range(len(leaves)):
+        proof = tree.generate_compact_proof(i)
+        if not verify_compact_proof(
+            proof["leaf_hash"], proof["dirs"], proof["siblings"], tree.root, "blake3"
+        ):
+            print(f"   ❌ BLAKE3 proof for leaf {i} failed")
+            return False
+        if verify_compact_proof(
+            proof["leaf_hash"], proof["dirs"], proof["siblings"], tree.root
+        ):
+            print(f"   ❌ BLAKE3 proof for leaf {i} verified with sha256")
+            return False
+
+    print(f"   Merkle root: {tree.root}")
+    print("   ✅ BLAKE3 root and proofs agree\n")
+    return True
+
+
 def main():
     """Run all tests."""
     print("=" * 60)
@@ -166,7 +363,13 @@ def main():
         test_merkle_proof_small,
         test_merkle_proof_large,
         test_proof_structure,
-        test_tampering_detection
+        test_tampering_detection,
+        test_odd_leaf_count,
+        test_stream_builder,
+        test_compact_proof,
+        test_sha256_backend,
+        test_leaf_size_validation,
+        test_blake3_proofs
     ]
 
     passed = 0
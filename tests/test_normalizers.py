@@ -0,0 +1,259 @@
+"""
+Test field normalizers.
+"""
+
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from builder import normalizers
+
+# Formats the validators accept, as full-string regexes
+HEX_FORMAT = re.compile(r'0x[0-9a-f]{64}')
+ADDRESS_FORMAT = re.compile(r'0x[0-9a-f]{40}')
+DECIMAL_FORMAT = re.compile(r'[0-9]+(\.[0-9]+)?')
+
+
+def accepts(normalizer, value):
+    """Return the normalized value, or None if the normalizer rejects it."""
+    try:
+        return normalizer(value)
+    except ValueError:
+        return None
+
+
+def test_validators():
+    """Test hex, address and decimal validation against the format regexes."""
+    print("🧪 Test 1: Validators")
+
+    hex_body = "0123456789abcdef" * 4
+    cases = [
+        (normalizers.lower_hex, HEX_FORMAT, str.lower, [
+            "0x" + hex_body,
+            "0X" + hex_body.upper(),
+            "0x" + hex_body[:-1],            # too short
+            "0x" + hex_body + "0",           # too long
+            "1x" + hex_body,                 # bad prefix
+            "x0" + hex_body,
+            "00" + hex_body,
+            "0x" + hex_body[:-1] + "g",      # non-hex
+            "0x" + hex_body[:-1] + "٣",  # non-ASCII digit
+            "0x" + hex_body[:-1] + " ",
+            "0x" + hex_body + "\n",          # trailing newline
+            "0x" + hex_body[:-1] + "\n",
+            "",
+        ]),
+        (normalizers.lower_address_optional, ADDRESS_FORMAT, str.lower, [
+            "0x" + hex_body[:40],
+            "0x" + hex_body[:40].upper(),
+            "0x" + hex_body[:39],
+            "0x" + hex_body[:41],
+            "1x" + hex_body[:40],
+            "0x" + hex_body[:39] + "z",
+            "0x" + hex_body[:39] + "０",  # fullwidth digit
+            "0x" + hex_body[:40] + "\n",
+        ]),
+        (normalizers.decimal_string, DECIMAL_FORMAT, str, [
+            "0", "123", "1.50", "007.0",
+            "", ".", "1.", ".5", "1.2.3", "-1", "+1", "1e5", " 1", "1 ",
+            "1.5\n", "1\n", "١٢", "1.٣", "²",
+        ]),
+    ]
+
+    for normalizer, fmt, convert, values in cases:
+        for value in values:
+            expected = convert(value) if fmt.fullmatch(convert(value)) else None
+            actual = accepts(normalizer, value)
+            if actual != expected:
+                print(f"   ❌ {normalizer.__name__}({value!r}) = {actual!r}, expected {expected!r}")
+                return False
+
+    # Optional validators accept empty values only
+    for normalizer in (normalizers.lower_address_optional, normalizers.decimal_string_optional):
+        if normalizer("") != "" or accepts(normalizer, "0x") is not None:
+            print(f"   ❌ {normalizer.__name__} mishandles empty or invalid values")
+            return False
+
+    print("   ✅ Validators match their formats\n")
+    return True
+
+
+def strftime_to_utc(value):
+    """Timestamp conversion without the RFC3339 fast path."""
+    if value.endswith('Z'):
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    else:
+        dt = datetime.fromisoformat(value)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_iso8601_to_utc():
+    """Test that the RFC3339 fast path matches full parsing and rejects bad dates."""
+    print("🧪 Test 2: iso8601_to_utc")
+
+    values = [
+        "2026-01-17T02:30:00Z",          # fast path
+        "2024-02-29T23:59:59Z",
+        "1000-01-01T00:00:00Z",
+        "9999-12-31T23:59:59Z",
+        "2026-01-17T10:30:00+08:00",
+        "2026-01-17T02:30:00+00:00",
+        "2026-01-17T02:30:00.123456Z",
+        "2026-01-17T02:30Z",
+        "2026-01-17 02:30:00Z",
+        "2026-02-30T00:00:00Z",          # invalid, fast path shape
+        "2023-02-29T00:00:00Z",
+        "2026-13-01T00:00:00Z",
+        "2026-00-10T00:00:00Z",
+        "2026-01-32T00:00:00Z",
+        "2026-01-17T24:00:00Z",
+        "2026-01-17T10:60:00Z",
+        "2026-01-17T10:00:60Z",
+        "2026-01-17T1a:00:00Z",
+        "2026-01-17T10:00:00z",
+    ]
+
+    for value in values:
+        try:
+            expected = strftime_to_utc(value)
+        except ValueError:
+            expected = None
+        actual = accepts(normalizers.iso8601_to_utc, value)
+        if actual != expected:
+            print(f"   ❌ iso8601_to_utc({value!r}) = {actual!r}, expected {expected!r}")
+            return False
+
+    # Years below 1000 are zero-padded as RFC3339 requires; glibc's %Y is not
+    for value in ("0001-01-01T00:00:00Z", "0999-12-31T20:00:00-02:00"):
+        if not re.fullmatch(r'0\d{3}-.*Z', normalizers.iso8601_to_utc(value)):
+            print(f"   ❌ Year of {value!r} not zero-padded")
+            return False
+
+    print("   ✅ Fast path matches full parsing\n")
+    return True
+
+
+# Sample column per registered normalizer, valid values only
+BATCH_VALUES = {
+    "trim_ascii": [" a ", "b", "\tc\n", "", "\u00a0d\u3000"],
+    "lower": ["MiXed", "", "ÄÖ", "İ"],
+    "upper": ["MiXed", "", "straße"],
+    "idna_lower_strip_trailing_dot": ["Example.COM.", "bücher.de", "xn--bcher-kva.de", "a..", ""],
+    "lower_hex": ["0x" + "AB" * 32, "0X" + "0f" * 32],
+    "lower_address_optional": ["0x" + "Ab" * 20, "", None],
+    "iso8601_to_utc": ["2026-01-17T02:30:00Z", "2026-01-17T10:30:00+08:00"],
+    "decimal_string": ["1.5", "10", "007.0"],
+    "decimal_string_optional": ["1.5", "", None],
+    "lower_enum": ["Payment", "REFUND", ""],
+    "lower_enum_optional": ["Payment", "", None],
+    "trim_ascii_optional": [" x ", "", None],
+    "deterministic_json_optional": [{"b": 1, "a": [1, 2.5, None]}, "", None, {}, [], "text", 2**70],
+}
+
+# Invalid values per normalizer; apply and apply_batch must both raise
+BATCH_INVALID = {
+    "lower_hex": ["0x1", ""],
+    "lower_address_optional": ["0x1"],
+    "iso8601_to_utc": ["not a date", "2026-02-30T00:00:00Z"],
+    "decimal_string": ["1.", ""],
+    "decimal_string_optional": [".5"],
+}
+
+
+def test_apply_batch():
+    """Test that apply_batch matches apply for every registered normalizer."""
+    print("🧪 Test 3: apply_batch")
+
+    missing = set(normalizers._NORMALIZERS) - set(BATCH_VALUES)
+    if missing:
+        print(f"   ❌ No sample values for {sorted(missing)}")
+        return False
+
+    skipped = []
+    for name, values in BATCH_VALUES.items():
+        if name == "deterministic_json_optional" and normalizers._deterministic_json is None:
+            skipped.append(name)
+            continue
+
+        expected = [normalizers.apply(name, value) for value in values]
+        if normalizers.apply_batch(name, values) != expected:
+            print(f"   ❌ apply_batch({name!r}) differs from apply")
+            return False
+
+        for value in BATCH_INVALID.get(name, []):
+            for call in (lambda: normalizers.apply(name, value),
+                         lambda: normalizers.apply_batch(name, [value])):
+                try:
+                    call()
+                except ValueError:
+                    continue
+                print(f"   ❌ {name}({value!r}) accepted")
+                return False
+
+    if skipped:
+        print(f"   ⏭️  Skipped (ledger-spec missing): {', '.join(skipped)}")
+    print(f"   ✅ apply_batch matches apply for {len(BATCH_VALUES) - len(skipped)} normalizers\n")
+    return True
+
+
+def test_trim_ascii():
+    """Test that trim_ascii keeps the str.strip() behaviour canonical bytes rely on."""
+    print("🧪 Test 4: trim_ascii")
+
+    values = [
+        " ORDER-1 ", "\tx\r\n", "\v\fy\x1c\x1f", "\u00a0z\u00a0", "\u3000w\u2028",
+        "\u200bkept\u200b", "", "   ", "a b",
+    ]
+
+    for value in values:
+        expected = value.strip()
+        for name in ("trim_ascii", "trim_ascii_optional"):
+            if normalizers.apply(name, value) != expected or normalizers.apply_batch(name, [value]) != [expected]:
+                print(f"   ❌ {name}({value!r}) differs from str.strip()")
+                return False
+
+    print("   ✅ trim_ascii matches str.strip()\n")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Normalizer Tests")
+    print("=" * 60)
+    print()
+
+    tests = [
+        test_validators,
+        test_iso8601_to_utc,
+        test_apply_batch,
+        test_trim_ascii
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"   ❌ Test failed with exception: {e}\n")
+            failed += 1
+
+    print("=" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)